@@ -47,6 +47,7 @@ from weblate.trans.signals import (
     component_post_update,
     store_post_load,
     translation_post_add,
+    unit_post_bulk_save,
     unit_pre_create,
     vcs_post_commit,
     vcs_post_push,
@@ -288,6 +289,18 @@ def unit_post_save_handler(sender, instance, created, **kwargs):
             handle_addon_error(addon, instance.translation.component)
 
 
+@receiver(unit_post_bulk_save)
+def unit_post_bulk_save_handler(sender, translation, units, created, **kwargs):
+    addons = Addon.objects.filter_event(translation.component, EVENT_UNIT_POST_SAVE)
+    for addon in addons:
+        translation.log_debug("running unit_post_save addon: %s", addon.name)
+        try:
+            for unit in units:
+                addon.addon.unit_post_save(unit, created)
+        except Exception:
+            handle_addon_error(addon, translation.component)
+
+
 @receiver(store_post_load)
 def store_post_load_handler(sender, translation, store, **kwargs):
     addons = Addon.objects.filter_event(translation.component, EVENT_STORE_POST_LOAD)
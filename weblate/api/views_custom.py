@@ -13,6 +13,7 @@ from rest_framework.exceptions import PermissionDenied, NotAuthenticated, NotFou
 from rest_framework.serializers import Serializer, ValidationError
 from rest_framework.serializers import CharField
 from weblate.trans.models.unit import UnitQuerySet
+from weblate.trans.signals import unit_post_bulk_save
 
 from weblate.utils.hash import  hash_to_checksum
 from weblate.auth.models import User
@@ -61,20 +62,37 @@ def export_view(request, project:str, lang: str):
     return Response(result)
 
 
+def is_bg3_dialog(translation) -> bool:
+    return (
+        translation.component.project.slug == "bg3"
+        and translation.language.code == "ko"
+        and translation.component.slug.startswith("dialog")
+    )
+
+
 @receiver(post_save, sender=Unit)
 def invalidate_bg3_dialog_cache(sender, instance, **kwargs):
     unit: Unit = instance
-    if unit.translation.component.project.slug != "bg3":
-        return
-    if unit.translation.language.code != "ko":
-        return
-    if not unit.translation.component.slug.startswith("dialog"):
+    if not is_bg3_dialog(unit.translation):
         return
     
     for location, filename, line in unit.get_locations():
         cache.delete(f"bg3_dialog:{filename.replace('/', '_')}")
 
 
+@receiver(unit_post_bulk_save)
+def invalidate_bg3_dialog_cache_bulk(sender, translation, units, **kwargs):
+    if not is_bg3_dialog(translation):
+        return
+
+    filenames = {
+        filename for unit in units for location, filename, line in unit.get_locations()
+    }
+    cache.delete_many(
+        [f"bg3_dialog:{filename.replace('/', '_')}" for filename in filenames]
+    )
+
+
 def serialize_unit_queryset(unit_queryset: UnitQuerySet) -> list[dict[str, str]]:
     values = unit_queryset.values('id', 'position', 'context', 'source', 'target', 'state', 'translation__component__slug', 'id_hash')
 
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from functools import lru_cache
 import re
 from typing import Iterable
 
@@ -73,16 +74,73 @@ mapping: list[tuple[str, str]] = [
 ]
 
 
+def has_top_level_branch(pattern: str) -> bool:
+    """그룹이나 문자 클래스 밖에 `|` 가 있는지 확인합니다."""
+    depth = 0
+    in_class = False
+    pos = 0
+    while pos < len(pattern):
+        char = pattern[pos]
+        if char == "\\":
+            pos += 2
+            continue
+        if in_class:
+            if char == "]":
+                in_class = False
+        elif char == "[":
+            in_class = True
+            # 맨 앞의 ^ 와 ] 는 클래스를 닫지 않음
+            if pattern[pos + 1 : pos + 2] == "^":
+                pos += 1
+            if pattern[pos + 1 : pos + 2] == "]":
+                pos += 1
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            return True
+        pos += 1
+    return False
+
+
+def get_literal_prefix(pattern: str) -> str:
+    """정규식 매치가 반드시 시작하는 리터럴 접두사를 반환합니다."""
+    # 대안이 있으면 모든 매치에 공통인 접두사가 없음
+    if has_top_level_branch(pattern):
+        return ""
+    prefix = []
+    pos = 2 if pattern.startswith(r"\b") else 0
+    while pos < len(pattern):
+        char = pattern[pos]
+        step = 1
+        if char == "\\":
+            char = pattern[pos + 1 : pos + 2]
+            step = 2
+            if not char or char.isalnum():
+                break
+        elif char in ".^$*+?{}[]|()":
+            break
+        # 수량자가 붙은 문자는 생략될 수 있음
+        if pattern[pos + step : pos + step + 1] in ("?", "*", "+", "{"):
+            break
+        prefix.append(char)
+        pos += step
+    return "".join(prefix)
+
+
 class SpellCheckItem:
     """맞춤법 검사 결과 항목."""
     src: str
     src_re: re.Pattern[str]
     dst: str
+    prefix: str
 
     def __init__(self, src: str, dst: str):
         self.src = src
         self.src_re = re.compile(src)
         self.dst = dst
+        self.prefix = get_literal_prefix(src)
     
     def check(self, text: str) -> bool:
         return self.src_re.search(text) is not None
@@ -95,8 +153,88 @@ class SpellCheckItem:
         return [(k, v) for k, v in result.items()]
 
 
+@dataclass(frozen=True)
+class SpellCheckHit:
+    """맞춤법 오류 위치."""
+    item: SpellCheckItem
+    start: int
+    end: int
+    src: str
+    dst: str
+
+
+class SpellChecker:
+    """모든 맞춤법 규칙을 한 번에 검사합니다.
+
+    규칙의 리터럴 접두사를 하나의 정규식으로 합쳐 후보 위치를 한 번에 찾고,
+    각 규칙의 정규식은 해당 위치에서만 확인합니다.
+    """
+
+    def __init__(self, items: Iterable[SpellCheckItem]):
+        self.items = list(items)
+        # 접두사 첫 글자별 규칙 목록
+        self.by_char: dict[str, list[int]] = {}
+        # 접두사가 없는 규칙은 문자열 전체를 검색
+        self.unprefixed: list[int] = []
+        for index, item in enumerate(self.items):
+            if item.prefix:
+                self.by_char.setdefault(item.prefix[0], []).append(index)
+            else:
+                self.unprefixed.append(index)
+        prefixes = sorted(
+            {re.escape(item.prefix) for item in self.items if item.prefix},
+            key=len,
+            reverse=True,
+        )
+        self.prefilter = re.compile("(?=(?:{}))".format("|".join(prefixes)))
+
+    def find(self, text: str) -> list[SpellCheckHit]:
+        """규칙 순서, 위치 순서대로 모든 오류를 반환합니다."""
+        matches: dict[int, list[re.Match[str]]] = {}
+        ends: dict[int, int] = {}
+        for candidate in self.prefilter.finditer(text):
+            start = candidate.start()
+            for index in self.by_char[text[start]]:
+                item = self.items[index]
+                # finditer 처럼 겹치지 않는 매치만 사용
+                if start < ends.get(index, 0) or not text.startswith(
+                    item.prefix, start
+                ):
+                    continue
+                match = item.src_re.match(text, start)
+                if match is not None:
+                    matches.setdefault(index, []).append(match)
+                    ends[index] = match.end()
+        for index in self.unprefixed:
+            found = list(self.items[index].src_re.finditer(text))
+            if found:
+                matches[index] = found
+        result = []
+        for index in sorted(matches):
+            item = self.items[index]
+            for match in matches[index]:
+                result.append(
+                    SpellCheckHit(
+                        item,
+                        match.start(),
+                        match.end(),
+                        match.group(0),
+                        item.src_re.sub(item.dst, match.group(0)),
+                    )
+                )
+        return result
+
+
 check_list: list[SpellCheckItem] = [SpellCheckItem(a, b) for a, b in mapping]
 
+spell_checker = SpellChecker(check_list)
+
+
+@lru_cache(maxsize=1024)
+def find_misspells(text: str) -> tuple[SpellCheckHit, ...]:
+    """검사 결과를 문자열 해시로 캐시해 검사, 설명, 수정이 공유합니다."""
+    return tuple(spell_checker.find(text))
+
 
 class KoreanMisspellCheck(TargetCheck):
     """한글 맞춤법 검사."""
@@ -107,18 +245,19 @@ class KoreanMisspellCheck(TargetCheck):
 
     def get_description(self, check_obj: "Check"):
         unit: "Unit" = check_obj.unit
-        result = []
-        for c in check_list:
-            for src, dst in c.get_replace_pair_list(unit.target):
-                result.append(f"{src} -> {dst}")
-        return "\n".join(result)
+        result = {}
+        for hit in find_misspells(unit.target):
+            result.setdefault((hit.item, hit.src), f"{hit.src} -> {hit.dst}")
+        return "\n".join(result.values())
 
     def check_single(self, source: str, target: str, unit):
-        return any(x.check(target) for x in check_list)
+        return bool(find_misspells(target))
 
     def get_fixup(self, unit: "Unit"):
-        result = [(x.src, x.dst) for x in check_list if x.check(unit.target)]        
-        return result    
+        result = {}
+        for hit in find_misspells(unit.target):
+            result.setdefault(hit.item, (hit.item.src, hit.item.dst))
+        return list(result.values())
 
 
 class ItalicTagCheck(TargetCheck):
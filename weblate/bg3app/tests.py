@@ -0,0 +1,83 @@
+from django.test import SimpleTestCase
+
+from weblate.bg3app.checks import (
+    KoreanMisspellCheck,
+    SpellChecker,
+    SpellCheckItem,
+    check_list,
+    get_literal_prefix,
+    spell_checker,
+)
+from weblate.checks.models import Check
+from weblate.trans.models import Unit
+
+TEXTS = [
+    "할수가 없는게 되요. 할수는 되요",
+    "그 쪽으로 가요. 이그 쪽, 저 쪽 그 다음",
+    "떄문에 됬다. 어떡게 오랫만이야. 갯수를 세어 봐.",
+    "할 수가 없는 게 돼요. 맞는 문장입니다.",
+    "을수가 줄수는 릴수가 을수 할수도",
+    "바래. 지마. 바래요 하지마 안되 지않아 야될",
+    "",
+]
+
+
+class KoreanMisspellCheckTest(SimpleTestCase):
+    def setUp(self):
+        self.check = KoreanMisspellCheck()
+
+    def test_literal_prefix(self):
+        self.assertEqual(get_literal_prefix(r"되요"), "되요")
+        self.assertEqual(get_literal_prefix(r"되\."), "되.")
+        self.assertEqual(get_literal_prefix(r"\b그 쪽"), "그 쪽")
+        self.assertEqual(get_literal_prefix(r"을수([는가])"), "을수")
+        self.assertEqual(get_literal_prefix(r"되?요"), "")
+        self.assertEqual(get_literal_prefix(r"되|돼"), "")
+        self.assertEqual(get_literal_prefix(r"되[|]"), "되")
+        self.assertEqual(get_literal_prefix(r"되\|"), "되|")
+
+    def assert_find(self, checker, text):
+        hits = [(hit.item, hit.start, hit.end, hit.dst) for hit in checker.find(text)]
+        expected = [
+            (item, match.start(), match.end(), item.src_re.sub(item.dst, match[0]))
+            for item in checker.items
+            for match in item.src_re.finditer(text)
+        ]
+        self.assertEqual(hits, expected)
+
+    def test_find(self):
+        for text in TEXTS:
+            with self.subTest(text=text):
+                self.assert_find(spell_checker, text)
+
+    def test_find_branch(self):
+        checker = SpellChecker([SpellCheckItem(r"되|돼", "X"), SpellCheckItem("요", "")])
+        self.assertEqual(checker.items[0].prefix, "")
+        self.assert_find(checker, "돼요 되요")
+
+    def test_check(self):
+        self.assertTrue(self.check.check_single("", TEXTS[0], None))
+        self.assertFalse(self.check.check_single("", TEXTS[3], None))
+
+    def test_description(self):
+        unit = Unit(source="string", target=TEXTS[0])
+        check = Check(unit=unit)
+        self.assertEqual(
+            self.check.get_description(check),
+            "되요 -> 돼요\n는게 -> 는 게\n할수가 -> 할 수가\n할수는 -> 할 수는",
+        )
+        unit = Unit(source="string", target=TEXTS[1])
+        check = Check(unit=unit)
+        self.assertEqual(
+            self.check.get_description(check),
+            "그 쪽 -> 그쪽\n저 쪽 -> 저쪽\n그 다음 -> 그다음",
+        )
+
+    def test_fixup(self):
+        unit = Unit(source="string", target=TEXTS[0])
+        self.assertEqual(
+            self.check.get_fixup(unit),
+            [("되요", "돼요"), ("는게", "는 게"), (r"할수([는가])", r"할 수\1")],
+        )
+        unit = Unit(source="string", target=TEXTS[3])
+        self.assertEqual(self.check.get_fixup(unit), [])
@@ -38,6 +38,12 @@ class Check:
     propagates = False
     param_type = None
     always_display = False
+    # Result depends only on strings, flags, language and state of the unit
+    pure = False
+    # Increase when changing the check logic to invalidate cached results
+    version = 1
+    # Evaluated for many units at once using update_many instead of per unit
+    batch = False
 
     def get_identifier(self):
         return self.check_id
@@ -112,6 +118,10 @@ class Check:
         """Check source string."""
         raise NotImplementedError()
 
+    def update_many(self, units):
+        """Update check for units and all units related to them."""
+        raise NotImplementedError()
+
     def check_chars(self, source, target, pos, chars):
         """Generic checker for chars presence."""
         try:
@@ -177,6 +187,7 @@ class TargetCheck(Check):
     """Basic class for target checks."""
 
     target = True
+    pure = True
 
     def check_target_unit_with_flag(self, sources, targets, unit):
         """We don't check flag value here."""
@@ -214,6 +225,7 @@ class TargetCheckParametrized(Check):
 
     default_disabled = True
     target = True
+    pure = True
 
     def get_value(self, unit):
         return unit.all_flags.get_value(self.enable_string)
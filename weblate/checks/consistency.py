@@ -17,11 +17,112 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 
+from collections import Counter, defaultdict
+
+from django.db.models import Count
 from django.utils.translation import gettext_lazy as _
 
 from weblate.checks.base import TargetCheck
 from weblate.utils.state import STATE_TRANSLATED
 
+# Number of content hashes processed in single query
+CONSISTENCY_BATCH_SIZE = 1000
+
+
+def update_consistency(project, language_id, content_hashes=None):
+    """Update inconsistent checks on same source strings in project language.
+
+    Units are grouped by the source in the database and only groups with more
+    than one distinct translation are evaluated. This matches
+    ConsistencyCheck.check_target_unit for all units at once.
+    """
+    from weblate.checks.models import Check
+    from weblate.trans.models import Translation, Unit
+
+    if language_id == project.source_language_id:
+        return
+    check_obj = ConsistencyCheck()
+    units = Unit.objects.filter(
+        translation__component__project=project, translation__language_id=language_id
+    )
+    if content_hashes is None:
+        batches = [units]
+    else:
+        content_hashes = list(content_hashes)
+        batches = [
+            units.filter(
+                content_hash__in=content_hashes[start : start + CONSISTENCY_BATCH_SIZE]
+            )
+            for start in range(0, len(content_hashes), CONSISTENCY_BATCH_SIZE)
+        ]
+
+    for scope in batches:
+        candidates = (
+            scope.order_by()
+            .values("content_hash")
+            .annotate(targets=Count("target", distinct=True))
+            .filter(targets__gt=1)
+            .values("content_hash")
+        )
+        groups = defaultdict(list)
+        for row in scope.filter(content_hash__in=candidates).values_list(
+            "pk",
+            "content_hash",
+            "target",
+            "state",
+            "translation_id",
+            "translation__component__allow_translation_propagation",
+        ):
+            groups[row[1]].append(row)
+
+        failing = {}
+        for group in groups.values():
+            # Translations in components propagating them
+            targets = Counter()
+            translated_targets = Counter()
+            for _pk, _hash, target, state, _translation, propagation in group:
+                if propagation:
+                    targets[target] += 1
+                    if state >= STATE_TRANSLATED:
+                        translated_targets[target] += 1
+            total = sum(targets.values())
+            total_translated = sum(translated_targets.values())
+            for pk, _hash, target, state, translation, _propagation in group:
+                if state >= STATE_TRANSLATED:
+                    different = total - targets[target]
+                else:
+                    different = total_translated - translated_targets[target]
+                if different:
+                    failing[pk] = translation
+
+        # Honor ignore flags
+        if failing:
+            for unit in Unit.objects.filter(pk__in=failing.keys()).prefetch():
+                if check_obj.should_skip(unit):
+                    del failing[unit.pk]
+
+        existing = dict(
+            Check.objects.filter(unit__in=scope, check=check_obj.check_id).values_list(
+                "unit_id", "unit__translation_id"
+            )
+        )
+        create = failing.keys() - existing.keys()
+        delete = existing.keys() - failing.keys()
+        if create:
+            Check.objects.bulk_create(
+                [
+                    Check(unit_id=pk, dismissed=False, check=check_obj.check_id)
+                    for pk in create
+                ],
+                ignore_conflicts=True,
+            )
+        if delete:
+            Check.objects.filter(unit_id__in=delete, check=check_obj.check_id).delete()
+
+        changed = {failing[pk] for pk in create} | {existing[pk] for pk in delete}
+        for translation in Translation.objects.filter(pk__in=changed):
+            translation.invalidate_cache()
+
 
 class PluralsCheck(TargetCheck):
     """Check for incomplete plural forms."""
@@ -75,7 +176,8 @@ class ConsistencyCheck(TargetCheck):
         "or is not translated in some components."
     )
     ignore_untranslated = False
-    propagates = True
+    pure = False
+    batch = True
 
     def check_target_unit(self, sources, targets, unit):
         for other in unit.same_source_units:
@@ -85,6 +187,16 @@ class ConsistencyCheck(TargetCheck):
                 return True
         return False
 
+    def update_many(self, units):
+        """Update the check for all same source units in one pass."""
+        content_hashes = defaultdict(set)
+        for unit in units:
+            translation = unit.translation
+            key = (translation.component.project, translation.language_id)
+            content_hashes[key].add(unit.content_hash)
+        for (project, language_id), hashes in content_hashes.items():
+            update_consistency(project, language_id, hashes)
+
     def check_single(self, source, target, unit):
         """We don't check target strings here."""
         return False
@@ -97,6 +209,7 @@ class TranslatedCheck(TargetCheck):
     name = _("Has been translated")
     description = _("This string has been translated in the past")
     ignore_untranslated = False
+    pure = False
 
     def check_target_unit(self, sources, targets, unit):
         if unit.translated:
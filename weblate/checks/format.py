@@ -18,6 +18,8 @@
 #
 
 import re
+import sre_constants
+import sre_parse
 from functools import lru_cache
 
 from django.utils.translation import gettext_lazy as _
@@ -173,6 +175,8 @@ WHITESPACE = re.compile(r"\s+")
 
 ENCYCLOPEDIA_MATCH = re.compile(r"{g\|[A-Za-z_:]+}([^{]+){/g}")
 
+NAMED_GROUP = re.compile(r"\(\?P<(\w+)>")
+
 
 def c_format_is_position_based(string):
     return "$" not in string and string != "%"
@@ -199,6 +203,187 @@ FLAG_RULES = {
 }
 
 
+def get_first_chars(items):
+    """Return set of characters the parsed expression has to start with.
+
+    Returns None when this can not be determined.
+    """
+    if not items:
+        return None
+    operator, value = items[0]
+    if operator is sre_constants.LITERAL:
+        return {chr(value)}
+    if operator is sre_constants.IN:
+        result = set()
+        for item_operator, item_value in value:
+            if item_operator is sre_constants.LITERAL:
+                result.add(chr(item_value))
+            elif item_operator is sre_constants.RANGE and (
+                item_value[1] - item_value[0] < 256
+            ):
+                result.update(chr(x) for x in range(item_value[0], item_value[1] + 1))
+            else:
+                return None
+        return result
+    if operator is sre_constants.SUBPATTERN:
+        if value[1] & sre_constants.SRE_FLAG_IGNORECASE:
+            return None
+        return get_first_chars(value[-1])
+    if operator is sre_constants.BRANCH:
+        result = set()
+        for branch in value[1]:
+            chars = get_first_chars(branch)
+            if chars is None:
+                return None
+            result.update(chars)
+        return result
+    return None
+
+
+class FormatScanner:
+    """Single pass extraction of format strings for several checks.
+
+    The expressions of all checks are merged into one, each of them wrapped
+    in an optional lookahead, so that single match reports results of all
+    checks at given position. It is tried only at positions where some of
+    the expressions can start.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.regexp = None
+        if len(rules) == 1:
+            # Nothing to merge, the expression is used directly
+            return
+        lookaheads = []
+        first_chars = set()
+        for i, (_check_id, regexp) in enumerate(rules):
+            if first_chars is not None:
+                chars = None
+                if not regexp.flags & re.IGNORECASE:
+                    chars = get_first_chars(
+                        sre_parse.parse(regexp.pattern, regexp.flags)
+                    )
+                if chars is None:
+                    first_chars = None
+                else:
+                    first_chars.update(chars)
+            # Named groups have to be unique in the merged expression
+            pattern = NAMED_GROUP.sub(r"(?P<check{}_\1>".format(i), regexp.pattern)
+            lookaheads.append(
+                "(?:(?=(?P<check{}>{}))|)".format(i, self.wrap_pattern(regexp, pattern))
+            )
+        if first_chars:
+            self.candidates = re.compile(
+                "[{}]".format("".join(re.escape(x) for x in sorted(first_chars)))
+            )
+        else:
+            self.candidates = re.compile(".", re.DOTALL)
+        self.regexp = re.compile("".join(lookaheads))
+        self.groups = [
+            (check_id, self.regexp.groupindex["check{}".format(i)], regexp.groups)
+            for i, (check_id, regexp) in enumerate(rules)
+        ]
+
+    @staticmethod
+    def wrap_pattern(regexp, pattern):
+        flags = "".join(
+            flag
+            for flag, value in (
+                ("i", re.IGNORECASE),
+                ("m", re.MULTILINE),
+                ("s", re.DOTALL),
+                ("x", re.VERBOSE),
+            )
+            if regexp.flags & value
+        )
+        if flags:
+            # Newline terminates possible trailing comment
+            return "(?{}:{}\n)".format(flags, pattern)
+        return "(?:{})".format(pattern)
+
+    @staticmethod
+    def get_item(string, regs, group, groups):
+        """Return item re.findall would return for given match group.
+
+        Only the first group is kept from tuples, that is all checks use.
+        """
+        if groups == 0:
+            return string[regs[group][0] : regs[group][1]]
+        start, end = regs[group + 1]
+        item = string[start:end] if start != -1 else ""
+        if groups == 1:
+            return item
+        return (item,)
+
+    def scan(self, string):
+        """Return matches as (start, end, findall item) keyed by check id."""
+        if self.regexp is None:
+            check_id, regexp = self.rules[0]
+            return {
+                check_id: [
+                    (
+                        match.start(),
+                        match.end(),
+                        self.get_item(string, match.regs, 0, regexp.groups),
+                    )
+                    for match in regexp.finditer(string)
+                ]
+            }
+        result = {check_id: [] for check_id, _regexp in self.rules}
+        ends = dict.fromkeys(result, 0)
+        for candidate in self.candidates.finditer(string):
+            start = candidate.start()
+            regs = self.regexp.match(string, start).regs
+            for check_id, group, groups in self.groups:
+                end = regs[group][1]
+                # Same as finditer, the matches do not overlap
+                if end == -1 or start < ends[check_id]:
+                    continue
+                result[check_id].append(
+                    (start, end, self.get_item(string, regs, group, groups))
+                )
+                ends[check_id] = end
+        return result
+
+
+@lru_cache(maxsize=128)
+def get_format_scanner(rules):
+    return FormatScanner(rules)
+
+
+@lru_cache(maxsize=None)
+def get_format_checks():
+    from weblate.checks.models import CHECKS
+
+    return [
+        check
+        for check in CHECKS.target.values()
+        if isinstance(check, BaseFormatCheck) and check.regexp is not None
+    ]
+
+
+def get_format_matches(unit, string):
+    """Return format string matches for all checks enabled on the unit.
+
+    The results are cached on the unit, so that all format checks share
+    a single scan of each string.
+    """
+    if "format_matches" not in unit.__dict__:
+        rules = tuple(
+            (check.check_id, check.regexp)
+            for check in get_format_checks()
+            if not check.should_skip(unit)
+        )
+        unit.format_scanner = get_format_scanner(rules) if rules else None
+        unit.format_matches = {}
+    cache = unit.format_matches
+    if string not in cache:
+        scanner = unit.format_scanner
+        cache[string] = scanner.scan(string) if scanner else {}
+    return cache[string]
+
+
 class BaseFormatCheck(TargetCheck):
     """Base class for fomat string checks."""
 
@@ -212,14 +397,14 @@ class BaseFormatCheck(TargetCheck):
     def check_generator(self, sources, targets, unit):
         # Special case languages with single plural form
         if len(sources) > 1 and len(targets) == 1:
-            yield self.check_format(sources[1], targets[0], False)
+            yield self.check_format(sources[1], targets[0], False, unit)
             return
 
         # Use plural as source in case singlular misses format string
         if (
             len(sources) > 1
-            and not self.extract_maches(sources[0])
-            and self.extract_maches(sources[1])
+            and not self.get_matches(sources[0], unit)
+            and self.get_matches(sources[1], unit)
         ):
             source = sources[1]
         else:
@@ -230,6 +415,7 @@ class BaseFormatCheck(TargetCheck):
             source,
             targets[0],
             len(sources) > 1 and len(unit.translation.plural.examples[0]) == 1,
+            unit,
         )
 
         # Do we have more to check?
@@ -239,7 +425,10 @@ class BaseFormatCheck(TargetCheck):
         # Check plurals against plural from source
         for i, target in enumerate(targets[1:]):
             yield self.check_format(
-                sources[1], target, len(unit.translation.plural.examples[i + 1]) == 1
+                sources[1],
+                target,
+                len(unit.translation.plural.examples[i + 1]) == 1,
+                unit,
             )
 
     def format_string(self, string):
@@ -255,7 +444,15 @@ class BaseFormatCheck(TargetCheck):
     def extract_maches(self, string):
         return [self.cleanup_string(x[0]) for x in self.regexp.findall(string)]
 
-    def check_format(self, source, target, ignore_missing):
+    def get_matches(self, string, unit=None):
+        """Return format strings, sharing the scan with other checks on unit."""
+        if unit is not None:
+            matches = get_format_matches(unit, string).get(self.check_id)
+            if matches is not None:
+                return [self.cleanup_string(x[2][0]) for x in matches]
+        return self.extract_maches(string)
+
+    def check_format(self, source, target, ignore_missing, unit=None):
         """Generic checker for format strings."""
         if not target or not source:
             return False
@@ -263,11 +460,11 @@ class BaseFormatCheck(TargetCheck):
         uses_position = True
 
         # Calculate value
-        src_matches = self.extract_maches(source)
+        src_matches = self.get_matches(source, unit)
         if src_matches:
             uses_position = any((self.is_position_based(x) for x in src_matches))
 
-        tgt_matches = self.extract_maches(target)
+        tgt_matches = self.get_matches(target, unit)
 
         if not uses_position:
             src_matches = set(src_matches)
@@ -302,6 +499,9 @@ class BaseFormatCheck(TargetCheck):
     def check_highlight(self, source, unit):
         if self.should_skip(unit):
             return []
+        matches = get_format_matches(unit, source).get(self.check_id)
+        if matches is not None:
+            return [(start, end, source[start:end]) for start, end, _item in matches]
         ret = []
         match_objects = self.regexp.finditer(source)
         for match in match_objects:
@@ -442,7 +642,7 @@ class JavaMessageFormatCheck(BaseFormatCheck):
 
         return super().should_skip(unit)
 
-    def check_format(self, source, target, ignore_missing):
+    def check_format(self, source, target, ignore_missing, unit=None):
         """Generic checker for format strings."""
         if not target or not source:
             return False
@@ -451,7 +651,7 @@ class JavaMessageFormatCheck(BaseFormatCheck):
         if target.count("'") % 2 != 0:
             return ["'"]
 
-        return super().check_format(source, target, ignore_missing)
+        return super().check_format(source, target, ignore_missing, unit)
 
     def format_result(self, result):
         if "'" in result:
@@ -515,4 +715,3 @@ class EncyclopediaTagCheck(BaseFormatCheck):
 
     def check_target(self, sources, targets, unit):
         return False
-
@@ -105,6 +105,9 @@ class WeblateChecksConf(AppConf):
         "weblate.checks.format.MultipleUnnamedFormatsCheck",
     )
 
+    # How long to cache results of pure checks, 0 disables the cache
+    CHECK_CACHE_TIMEOUT = 7 * 24 * 3600
+
     class Meta:
         prefix = ""
 
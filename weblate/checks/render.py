@@ -47,6 +47,7 @@ class MaxSizeCheck(TargetCheckParametrized):
     default_disabled = True
     last_font = None
     always_display = True
+    pure = False
 
     @property
     def param_type(self):
@@ -164,6 +164,7 @@ class SameCheck(TargetCheck):
     check_id = "same"
     name = _("Unchanged translation")
     description = _("Source and translation are identical")
+    pure = False
 
     def should_ignore(self, source, unit):
         """Check whether given unit should be ignored."""
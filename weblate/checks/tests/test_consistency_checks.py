@@ -21,10 +21,18 @@
 
 from django.test import TestCase
 
-from weblate.checks.consistency import PluralsCheck, SamePluralsCheck, TranslatedCheck
+from weblate.checks.consistency import (
+    PluralsCheck,
+    SamePluralsCheck,
+    TranslatedCheck,
+    update_consistency,
+)
+from weblate.checks.models import Check
 from weblate.checks.tests.test_checks import MockUnit
-from weblate.trans.models import Change
+from weblate.trans.models import Change, Component, Unit
+from weblate.trans.tasks import reconcile_consistency
 from weblate.trans.tests.test_views import ViewTestCase
+from weblate.utils.state import STATE_TRANSLATED
 
 
 class PluralsCheckTest(TestCase):
@@ -103,3 +111,66 @@ class TranslatedCheckTest(ViewTestCase):
         unit = self.get_unit()
         unit.change_set.create(action=Change.ACTION_SOURCE_CHANGE)
         self.assertFalse(self.run_check())
+
+
+class ConsistencyCheckTest(ViewTestCase):
+    def setUp(self):
+        super().setUp()
+        self.component2 = Component.objects.create(
+            name="Test 2",
+            slug="test-2",
+            project=self.project,
+            repo=self.git_repo_path,
+            push=self.git_repo_path,
+            vcs="git",
+            filemask="po/*.po",
+            template="",
+            file_format="po",
+            new_base="",
+            allow_translation_propagation=False,
+        )
+
+    def get_other_unit(self):
+        return Unit.objects.get(
+            translation__component=self.component2,
+            translation__language_code="cs",
+            source__startswith="Hello, world!\n",
+        )
+
+    def assert_inconsistent(self, unit, expected):
+        self.assertEqual(
+            Check.objects.filter(unit=unit, check="inconsistent").exists(), expected
+        )
+
+    def test_inconsistent(self):
+        unit = self.get_unit()
+        other = self.get_other_unit()
+        other.translate(self.user, "Ahoj svete!\n", STATE_TRANSLATED)
+        unit.translate(self.user, "Nazdar svete!\n", STATE_TRANSLATED)
+        # Translations from components not propagating them are ignored
+        self.assert_inconsistent(unit, False)
+        self.assert_inconsistent(other, True)
+
+        Check.objects.filter(check="inconsistent").delete()
+        update_consistency(self.project, unit.translation.language_id)
+        self.assert_inconsistent(unit, False)
+        self.assert_inconsistent(other, True)
+
+        unit.translate(self.user, "Ahoj svete!\n", STATE_TRANSLATED)
+        self.assert_inconsistent(unit, False)
+        self.assert_inconsistent(other, False)
+
+    def test_reconcile(self):
+        unit = self.get_unit()
+        other = self.get_other_unit()
+        other.translate(self.user, "Ahoj svete!\n", STATE_TRANSLATED)
+        unit.translate(self.user, "Nazdar svete!\n", STATE_TRANSLATED)
+        self.assert_inconsistent(unit, False)
+
+        # Changed propagation is picked up by the daily task
+        Component.objects.filter(pk=self.component2.pk).update(
+            allow_translation_propagation=True
+        )
+        reconcile_consistency()
+        self.assert_inconsistent(unit, True)
+        self.assert_inconsistent(other, True)
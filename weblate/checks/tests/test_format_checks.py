@@ -25,6 +25,7 @@ from django.test import SimpleTestCase
 from weblate.checks.format import (
     CFormatCheck,
     CSharpFormatCheck,
+    FormatScanner,
     I18NextInterpolationCheck,
     JavaFormatCheck,
     JavaMessageFormatCheck,
@@ -34,6 +35,7 @@ from weblate.checks.format import (
     PHPFormatCheck,
     PythonBraceFormatCheck,
     PythonFormatCheck,
+    get_format_matches,
 )
 from weblate.checks.models import Check
 from weblate.checks.qt import QtFormatCheck, QtPluralCheck
@@ -801,3 +803,47 @@ class MultipleUnnamedFormatsCheckTestCase(SimpleTestCase):
         self.assertTrue(
             self.check.check_source(["{} {}"], MockUnit(flags="python-brace-format"))
         )
+
+
+class FormatScannerTest(SimpleTestCase):
+    def test_scan(self):
+        checks = [
+            PythonFormatCheck(),
+            PythonBraceFormatCheck(),
+            CSharpFormatCheck(),
+            RubyFormatCheck(),
+            I18NextInterpolationCheck(),
+            PercentPlaceholdersCheck(),
+        ]
+        scanner = FormatScanner(
+            tuple((check.check_id, check.regexp) for check in checks)
+        )
+        for string in (
+            "",
+            "text",
+            "%s %(name)d {0} {name:>4} %{var} %<var>s $t(key) {{ var }} %var%",
+            "%%s {{0}} %1$s {0,-3:N2} 100%",
+        ):
+            result = scanner.scan(string)
+            for check in checks:
+                self.assertEqual(
+                    [(start, end) for start, end, _item in result[check.check_id]],
+                    [match.span() for match in check.regexp.finditer(string)],
+                )
+                self.assertEqual(
+                    [
+                        check.cleanup_string(item[0])
+                        for _start, _end, item in result[check.check_id]
+                    ],
+                    check.extract_maches(string),
+                )
+
+    def test_unit(self):
+        check = PythonFormatCheck()
+        unit = MockUnit(flags="python-format,python-brace-format")
+        matches = get_format_matches(unit, "%s {0}")
+        self.assertEqual(set(matches), {"python_format", "python_brace_format"})
+        self.assertIs(matches, get_format_matches(unit, "%s {0}"))
+        self.assertEqual(check.get_matches("%s {0}", unit), ["s"])
+        self.assertTrue(check.check_target(["%s"], ["%d"], unit))
+        self.assertFalse(check.check_target(["%s"], ["%s"], unit))
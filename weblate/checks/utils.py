@@ -16,9 +16,40 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 
+from functools import lru_cache
+
+from siphashc import siphash
+
 from weblate.checks.models import CHECKS
 
 
+@lru_cache(maxsize=None)
+def get_pure_checks_version():
+    """Return hash identifying versions of all pure target checks."""
+    return siphash(
+        "Weblate   Checks",
+        ",".join(
+            "{}:{}".format(check, check_obj.version)
+            for check, check_obj in sorted(CHECKS.target.items())
+            if check_obj.pure
+        ),
+    )
+
+
+def get_check_cache_key(unit):
+    """Return cache key for results of pure checks on the unit."""
+    translation = unit.translation
+    return "check-result:{}:{}:{}:{}:{}:{}:{}".format(
+        get_pure_checks_version(),
+        siphash("Weblate   Checks", unit.source),
+        siphash("Weblate   Checks", unit.target),
+        siphash("Weblate   Checks", unit.all_flags.format()),
+        translation.language_id,
+        translation.plural_id,
+        unit.state,
+    )
+
+
 def highlight_string(source, unit):
     """Return highlights for a string."""
     if unit is None:
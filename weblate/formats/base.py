@@ -37,6 +37,31 @@ EXPAND_LANGS = {
 }
 
 
+def match_plural(language, plural_forms):
+    """Return plural object matching gettext plural forms definition."""
+    from weblate.lang.models import Plural
+
+    if not plural_forms:
+        return language.plural
+    try:
+        number, formula = Plural.parse_plural_forms(plural_forms)
+    except ValueError:
+        return language.plural
+
+    # Find matching one
+    for plural in language.plural_set.iterator():
+        if plural.same_plural(number, formula):
+            return plural
+
+    # Create new one
+    return Plural.objects.create(
+        language=language,
+        source=Plural.SOURCE_GETTEXT,
+        number=number,
+        formula=formula,
+    )
+
+
 class UnitNotFound(Exception):
     def __str__(self):
         args = list(self.args)
@@ -170,6 +195,8 @@ class TranslationFormat:
     unit_class: Type[TranslationUnit] = TranslationUnit
     autoload: Tuple[str, ...] = ()
     can_add_unit: bool = True
+    # Whether parsed store can be pickled to the store cache
+    can_cache_store: bool = True
     language_format: str = "posix"
     simple_filename: bool = True
     new_translation: Optional[str] = None
@@ -229,9 +256,13 @@ class TranslationFormat:
     def load(cls, storefile):
         raise NotImplementedError()
 
+    def get_plural_forms(self):
+        """Return plural forms definition stored in the file."""
+        return None
+
     def get_plural(self, language):
         """Return matching plural object."""
-        return language.plural
+        return match_plural(language, self.get_plural_forms())
 
     @cached_property
     def has_template(self):
@@ -290,10 +321,33 @@ class TranslationFormat:
             return self._find_unit_template(context)
         return self._find_unit_bilingual(context, source)
 
-    def add_unit(self, ttkit_unit):
+    def _add_unit(self, ttkit_unit):
         """Add new unit to underlaying store."""
         raise NotImplementedError()
 
+    def add_unit(self, ttkit_unit):
+        """Add new unit to underlaying store and update the indexes."""
+        self._add_unit(ttkit_unit)
+        self.index_unit(ttkit_unit)
+
+    def index_unit(self, ttkit_unit):
+        """Update already built unit lists and indexes with added unit."""
+        mono_unit = self.unit_class(self, None, ttkit_unit)
+        if "mono_units" in self.__dict__:
+            self.mono_units.append(mono_unit)
+        if "_context_index" in self.__dict__:
+            self._context_index[mono_unit.context] = mono_unit
+        if self.has_template:
+            # Units are based on template, the added unit replaces missing one
+            self.__dict__.pop("all_units", None)
+            self.__dict__.pop("_source_index", None)
+        else:
+            unit = self.unit_class(self, ttkit_unit)
+            if "all_units" in self.__dict__:
+                self.all_units.append(unit)
+            if "_source_index" in self.__dict__:
+                self._source_index[unit.context, unit.source] = unit
+
     def update_header(self, **kwargs):
         """Update store header if available."""
         return
@@ -315,6 +369,13 @@ class TranslationFormat:
         """Save underlaying store to disk."""
         raise NotImplementedError()
 
+    def save_units(self, units):
+        """Save underlaying store to disk after changing given units.
+
+        Formats can override this to write only the changed parts of the file.
+        """
+        self.save()
+
     @property
     def all_store_units(self):
         """Wrapper for all store units for possible filtering."""
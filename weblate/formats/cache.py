@@ -0,0 +1,128 @@
+#
+# Copyright © 2012 - 2020 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Content addressed cache of parsed translation files."""
+
+
+import hashlib
+import os
+import pickle
+import time
+
+import translate.__version__
+from django.conf import settings
+
+from weblate import VERSION
+from weblate.utils.data import data_dir
+from weblate.utils.errors import report_error
+
+# Increase when changing layout of the cached data
+CACHE_VERSION = 1
+
+
+def get_store_cache_key(file_format, filename, revision, *args):
+    """Return cache key for parsed file.
+
+    The revision is expected to identify content of the file and all files
+    it depends on (for example the template).
+    """
+    parts = [
+        str(CACHE_VERSION),
+        VERSION,
+        translate.__version__.sver,
+        file_format,
+        filename,
+        revision,
+    ]
+    parts.extend(str(arg) for arg in args)
+    return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+
+def get_store_cache_path(key):
+    return data_dir("cache", "stores", key[:2], key)
+
+
+def load_cached_store(key, template_store=None):
+    """Return cached store or None if it is not available."""
+    filename = get_store_cache_path(key)
+    try:
+        with open(filename, "rb") as handle:
+            cls, state, has_template = pickle.load(handle)
+        # Track usage for the cleanup
+        os.utime(filename)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        # Corrupted or incompatible entry
+        try:
+            os.unlink(filename)
+        except OSError:
+            pass
+        return None
+    store = cls.__new__(cls)
+    store.__dict__.update(state)
+    store.template_store = template_store if has_template else None
+    return store
+
+
+def save_cached_store(key, store):
+    """Store parsed file in the cache.
+
+    The template store is not saved as it is loaded separately by the caller.
+    """
+    state = store.__dict__.copy()
+    has_template = state.pop("template_store", None) is not None
+    try:
+        data = pickle.dumps(
+            (store.__class__, state, has_template), pickle.HIGHEST_PROTOCOL
+        )
+    except Exception:
+        # Some stores can not be serialized (for example lxml based ones)
+        return
+    filename = get_store_cache_path(key)
+    # Write to temporary file first to avoid other processes reading
+    # incomplete data
+    temp_name = "{}.{}.tmp".format(filename, os.getpid())
+    try:
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        with open(temp_name, "wb") as handle:
+            handle.write(data)
+        os.replace(temp_name, filename)
+    except OSError:
+        # The cache is optional, failing to write it should not break loading
+        report_error(cause="Failed to save parsed file cache")
+        try:
+            os.unlink(temp_name)
+        except OSError:
+            pass
+
+
+def cleanup_store_cache(days=None):
+    """Remove cache entries which were not used recently."""
+    if days is None:
+        days = settings.STORE_CACHE_DAYS
+    cutoff = time.time() - days * 86400
+    for root, _unused, filenames in os.walk(data_dir("cache", "stores")):
+        for filename in filenames:
+            full_name = os.path.join(root, filename)
+            try:
+                if os.stat(full_name).st_mtime < cutoff:
+                    os.unlink(full_name)
+            except FileNotFoundError:
+                continue
@@ -128,7 +128,7 @@ class ConvertFormat(TranslationFormat):
             report_error(cause="File parse error")
             return False
 
-    def add_unit(self, ttkit_unit):
+    def _add_unit(self, ttkit_unit):
         self.store.addunit(ttkit_unit)
 
     @classmethod
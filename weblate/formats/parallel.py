@@ -0,0 +1,139 @@
+#
+# Copyright © 2012 - 2020 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Parsing translation files in worker processes."""
+
+
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import current_process, get_context
+from typing import List, NamedTuple, Optional, Tuple
+
+from weblate.formats.base import match_plural
+from weblate.formats.models import FILE_FORMATS
+
+# Templates parsed within the worker process
+TEMPLATE_CACHE = {}
+
+
+class ParsedUnit(NamedTuple):
+    """Snapshot of translation unit attributes needed for database sync."""
+
+    id_hash: int
+    content_hash: int
+    context: str
+    source: str
+    target: str
+    notes: str
+    locations: str
+    flags: str
+    previous_source: str
+    template: Optional[bool]
+    readonly: bool
+    translated: bool
+    fuzzy: Tuple[bool, bool]
+    approved: Tuple[bool, bool]
+
+    @classmethod
+    def from_unit(cls, unit):
+        return cls(
+            id_hash=unit.id_hash,
+            content_hash=unit.content_hash,
+            context=unit.context,
+            source=unit.source,
+            target=unit.target,
+            notes=unit.notes,
+            locations=unit.locations,
+            flags=unit.flags,
+            previous_source=unit.previous_source,
+            template=None if unit.template is None else True,
+            readonly=unit.is_readonly(),
+            translated=unit.is_translated(),
+            fuzzy=(unit.is_fuzzy(False), unit.is_fuzzy(True)),
+            approved=(unit.is_approved(False), unit.is_approved(True)),
+        )
+
+    def is_readonly(self):
+        return self.readonly
+
+    def is_translated(self):
+        return self.translated
+
+    def is_fuzzy(self, fallback=False):
+        return self.fuzzy[bool(fallback)]
+
+    def is_approved(self, fallback=False):
+        return self.approved[bool(fallback)]
+
+
+class ParsedStore:
+    """Parsed translation file with content units only.
+
+    Provides subset of TranslationFormat interface used when syncing database.
+    """
+
+    def __init__(self, content_units: List[ParsedUnit], plural_forms=None):
+        self.content_units = content_units
+        self.plural_forms = plural_forms
+
+    def get_plural(self, language):
+        return match_plural(language, self.plural_forms)
+
+
+def parse_store(file_format, filename, template, language_code, is_template):
+    """Parse translation file, this is executed in a worker process."""
+    format_cls = FILE_FORMATS[file_format]
+    template_store = None
+    if template:
+        if template not in TEMPLATE_CACHE:
+            TEMPLATE_CACHE[template] = format_cls.parse(template)
+        template_store = TEMPLATE_CACHE[template]
+    store = format_cls.parse(
+        filename, template_store, language_code=language_code, is_template=is_template
+    )
+    return ParsedStore(
+        [ParsedUnit.from_unit(unit) for unit in store.content_units],
+        store.get_plural_forms(),
+    )
+
+
+def get_parse_executor(processes):
+    """Return process pool for parsing or None if not available."""
+    # Daemonic processes (for example Celery prefork workers) can not
+    # have children
+    if processes <= 1 or current_process().daemon:
+        return None
+    kwargs = {}
+    if sys.version_info >= (3, 7):
+        # Fork is needed to inherit configured Django in the workers
+        kwargs["mp_context"] = get_context("fork")
+    return ProcessPoolExecutor(max_workers=processes, **kwargs)
+
+
+def get_parsed_store(future):
+    """Return result of parsing or None if it has failed.
+
+    The caller is expected to parse the file on its own in that case to
+    handle the errors.
+    """
+    if future is None:
+        return None
+    try:
+        return future.result()
+    except Exception:
+        return None
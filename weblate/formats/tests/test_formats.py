@@ -19,6 +19,7 @@
 """File format specific behavior."""
 
 import os.path
+import pickle
 import shutil
 from io import BytesIO
 from unittest import SkipTest, TestCase
@@ -30,6 +31,7 @@ from translate.storage.po import pofile
 from weblate.formats.auto import AutodetectFormat, detect_filename
 from weblate.formats.base import UpdateError
 from weblate.formats.models import FILE_FORMATS
+from weblate.formats.parallel import parse_store
 from weblate.formats.ttkit import (
     AndroidFormat,
     CSVFormat,
@@ -509,6 +511,36 @@ class AndroidFormatTest(XMLMixin, AutoFormatTest):
             "res/values-b+sr+Latn/strings.xml",
         )
 
+    def test_find_add_template(self):
+        testfile = os.path.join(self.tempdir, "test.xml")
+        with open(testfile, "w") as handle:
+            handle.write(self.MATCH)
+        storage = self.FORMAT(testfile, self.parse_file(self.FILE))
+        unit, add = storage.find_unit(self.FIND_CONTEXT)
+        self.assertTrue(add)
+        storage.add_unit(unit.unit)
+        # The index is updated with added unit
+        unit, add = storage.find_unit(self.FIND_CONTEXT)
+        self.assertFalse(add)
+        self.assertEqual(len(storage.mono_units), 1)
+
+    def test_save_units(self):
+        testfile = os.path.join(self.tempdir, "strings.xml")
+        with open(self.FILE, "rb") as handle:
+            testdata = handle.read()
+        with open(testfile, "wb") as handle:
+            handle.write(testdata)
+        storage = self.parse_file(testfile)
+        unit = storage.all_units[0]
+        unit.set_target("Ahoj světe!")
+        storage.save_units([unit])
+        # Only the changed string is written, the header is kept
+        with open(testfile, "rb") as handle:
+            self.assertEqual(
+                handle.read(),
+                testdata.replace(b"Hello, world!\\n", "Ahoj světe!".encode()),
+            )
+
 
 class XliffFormatTest(XMLMixin, AutoFormatTest):
     FORMAT = XliffFormat
@@ -796,6 +828,59 @@ class FlatXMLFormatTest(AutoFormatTest):
     NEW_UNIT_MATCH = b'<str key="key">Source string</str>\n'
     EXPECTED_FLAGS = ""
 
+    def test_save_units(self):
+        testfile = os.path.join(self.tempdir, "cs-flat.xml")
+        with open(self.FILE, "rb") as handle:
+            testdata = handle.read()
+        with open(testfile, "wb") as handle:
+            handle.write(testdata.replace(b"  <str", b"\t<str"))
+        storage = self.parse_file(testfile)
+        first, second = storage.all_units
+        second.set_target("Changed value.")
+        storage.save_units([second])
+        with open(testfile, "rb") as handle:
+            self.assertEqual(
+                handle.read(),
+                testdata.replace(b"  <str", b"\t<str").replace(
+                    b"Translated value.", b"Changed value."
+                ),
+            )
+
+        # Changes are written on top of previous incremental save
+        first.set_target("Hello!")
+        storage.save_units([first])
+        with open(testfile, "rb") as handle:
+            self.assertIn(b'\t<str key="hello_world">Hello!</str>', handle.read())
+
+        # The whole file is written when it was changed meanwhile
+        with open(testfile, "wb") as handle:
+            handle.write(testdata)
+        second.set_target("Other value.")
+        storage.save_units([second])
+        with open(testfile, "rb") as handle:
+            newdata = handle.read()
+        self.assertIn(b'  <str key="hello_world">Hello!</str>', newdata)
+        self.assertIn(b'  <str key="resource_key">Other value.</str>', newdata)
+
+    def test_streaming(self):
+        testfile = os.path.join(self.tempdir, "cs-flat.xml")
+        shutil.copy(self.FILE, testfile)
+        storage = self.parse_file(testfile)
+        # Units are read without parsing the document
+        self.assertEqual(len(storage.all_units), self.COUNT)
+        self.assertIsNone(storage.parsed_store)
+        unit, add = storage.find_unit(self.FIND_CONTEXT, self.FIND)
+        self.assertFalse(add)
+        self.assertEqual(unit.target, self.FIND_MATCH)
+        # Editing binds the unit to the parsed document
+        unit.set_target("Ahoj světe!")
+        self.assertIsNotNone(storage.parsed_store)
+        storage.save()
+        with open(testfile, "rb") as handle:
+            self.assertIn(
+                '<str key="hello_world">Ahoj světe!</str>'.encode(), handle.read()
+            )
+
 
 class INIFormatTest(AutoFormatTest):
     FORMAT = INIFormat
@@ -818,3 +903,21 @@ class INIFormatTest(AutoFormatTest):
 class InnoSetupINIFormatTest(INIFormatTest):
     FORMAT = InnoSetupINIFormat
     EXT = "islu"
+
+
+class ParallelParseTest(FixtureTestCase):
+    def test_parse_store(self):
+        parsed = pickle.loads(
+            pickle.dumps(parse_store("po", TEST_PO, None, "cs", False))
+        )
+        store = PoFormat.parse(TEST_PO, language_code="cs")
+        self.assertEqual(len(parsed.content_units), len(store.content_units))
+        for expected, unit in zip(store.content_units, parsed.content_units):
+            self.assertEqual(expected.id_hash, unit.id_hash)
+            self.assertEqual(expected.target, unit.target)
+            self.assertEqual(expected.is_translated(), unit.is_translated())
+            self.assertEqual(expected.is_fuzzy(True), unit.is_fuzzy(True))
+        language = Language.objects.get(code="cs")
+        self.assertEqual(
+            parsed.get_plural(language).formula, store.get_plural(language).formula
+        )
@@ -24,14 +24,19 @@ import inspect
 import os
 import re
 import subprocess
+from bisect import bisect_right
+from copy import deepcopy
 
 from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
+from lxml import etree
 from lxml.etree import XMLSyntaxError
 from translate.misc import quote
 from translate.misc.multistring import multistring
+from translate.misc.xml_helpers import getText, reindent
 from translate.storage.base import TranslationStore
 from translate.storage.csvl10n import csv
+from translate.storage.flatxml import FlatXMLUnit as BaseFlatXMLUnit
 from translate.storage.lisa import LISAfile
 from translate.storage.po import pofile, pounit
 from translate.storage.poxliff import PoXliffFile
@@ -59,6 +64,8 @@ from weblate.utils.errors import report_error
 LOCATIONS_RE = re.compile(r"^([+-]|.*, [+-]|.*:[+-])")
 SUPPORTS_FUZZY = (pounit, tsunit)
 XLIFF_FUZZY_STATES = {"new", "needs-translation", "needs-adaptation", "needs-l10n"}
+NEWLINE_RE = re.compile(b"\n")
+START_TAG_END = (b" ", b"\t", b"\n", b"/", b">")
 
 
 class TTKitUnit(TranslationUnit):
@@ -159,10 +166,11 @@ class TTKitUnit(TranslationUnit):
         We currently extract maxwidth attribute.
         """
         flags = Flags()
-        if hasattr(self.unit, "xmlelement"):
-            flags.merge(self.unit.xmlelement)
-        if hasattr(self.template, "xmlelement"):
-            flags.merge(self.template.xmlelement)
+        # The element can be created on access for streamed units
+        for unit in (self.unit, self.template):
+            xmlelement = getattr(unit, "xmlelement", None)
+            if xmlelement is not None:
+                flags.merge(xmlelement)
         return flags.format()
 
 
@@ -280,7 +288,7 @@ class TTKitFormat(TranslationFormat):
 
         return store
 
-    def add_unit(self, ttkit_unit):
+    def _add_unit(self, ttkit_unit):
         """Add new unit to underlaying store."""
         if isinstance(self.store, LISAfile):
             # LISA based stores need to know this
@@ -381,6 +389,236 @@ class TTKitFormat(TranslationFormat):
         return (unit for unit in self.store.units if not unit.isobsolete())
 
 
+class IncrementalXMLMixin:
+    """Mixin writing changed units in place of their XML elements.
+
+    Only byte ranges of the changed elements are replaced in the file, the rest
+    of it is copied unchanged. The whole store is serialized whenever the file
+    can not be safely patched.
+    """
+
+    def __init__(
+        self, storefile, template_store=None, language_code=None, is_template=False
+    ):
+        source_stat = self.get_source_stat(storefile)
+        super().__init__(storefile, template_store, language_code, is_template)
+        self.source_stat = source_stat
+        # Line shifts caused by previous incremental saves
+        self.line_shifts = []
+
+    @staticmethod
+    def get_source_stat(filename):
+        if not isinstance(filename, str):
+            return None
+        try:
+            stat = os.stat(filename)
+        except OSError:
+            return None
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def prepare_element(self, element):
+        """Prepare element for serialization."""
+        return
+
+    def get_replacement(self, content, line_starts, element):
+        """Locate element in the file content and serialize it.
+
+        Returns tuple of start and end offsets, new content and line shifts or None
+        if element can not be located reliably.
+        """
+        line = element.sourceline
+        tag = element.tag
+        if line is None or not isinstance(tag, str) or "{" in tag:
+            return None
+        following = element.getnext()
+        if following is not None and following.sourceline == line:
+            return None
+
+        # The sourceline is where start tag ends
+        current = line + sum(delta for shift, delta in self.line_shifts if shift < line)
+        if current >= len(line_starts):
+            return None
+        opening = "<{}".format(tag).encode()
+        start = content.rfind(opening, 0, line_starts[current])
+        while start != -1:
+            after = start + len(opening)
+            if content[after : after + 1] in START_TAG_END:
+                break
+            start = content.rfind(opening, 0, start)
+        if start == -1:
+            return None
+        closing = re.compile(rb"</%s\s*>" % re.escape(tag.encode()))
+        match = closing.search(content, start)
+        if match is None:
+            return None
+        end = match.end()
+        original = content[start:end]
+
+        # Verify we have found matching element
+        try:
+            parsed = etree.fromstring(original)
+        except XMLSyntaxError:
+            return None
+        if parsed.tag != tag or dict(parsed.attrib) != dict(element.attrib):
+            return None
+
+        self.prepare_element(element)
+        fragment = etree.tostring(element, encoding="utf-8", with_tail=False)
+        if b"xmlns" in fragment and b"xmlns" not in original:
+            return None
+        # The start tag of the new content ends on the line where it starts
+        offset = bisect_right(line_starts, start) - current
+        delta = fragment.count(b"\n") - original.count(b"\n")
+        return (start, end, fragment, [(line - 1, offset), (line, delta - offset)])
+
+    def get_patched_content(self, units):
+        """Return list of file chunks with changed units or None."""
+        if (
+            self.source_stat is None
+            or self.get_source_stat(self.storefile) != self.source_stat
+        ):
+            return None
+        encoding = self.store.document.docinfo.encoding
+        if not encoding or encoding.lower() not in ("utf-8", "utf8"):
+            return None
+        elements = {}
+        for unit in units:
+            element = getattr(unit.unit, "xmlelement", None)
+            if element is None:
+                return None
+            elements[id(element)] = element
+
+        with open(self.storefile, "rb") as handle:
+            content = handle.read()
+        if b"\r" in content:
+            return None
+        line_starts = [0]
+        line_starts.extend(match.end() for match in NEWLINE_RE.finditer(content))
+
+        replacements = []
+        for element in elements.values():
+            replacement = self.get_replacement(content, line_starts, element)
+            if replacement is None:
+                return None
+            replacements.append(replacement)
+        replacements.sort(key=lambda item: item[0])
+
+        result = []
+        position = 0
+        for start, end, fragment, _shifts in replacements:
+            if start < position:
+                return None
+            result.append(content[position:start])
+            result.append(fragment)
+            position = end
+        result.append(content[position:])
+        for _start, _end, _fragment, shifts in replacements:
+            self.line_shifts.extend(shift for shift in shifts if shift[1])
+        return result
+
+    def save(self):
+        """Save underlaying store to disk."""
+        super().save()
+        # Line numbers of the parsed elements no longer match the file
+        self.source_stat = None
+
+    def save_units(self, units):
+        """Save underlaying store to disk replacing only changed units."""
+        result = self.get_patched_content(units)
+        if result is None:
+            self.save()
+            return
+
+        def save_content(handle):
+            handle.writelines(result)
+
+        self.save_atomic(self.storefile, save_content)
+        self.source_stat = self.get_source_stat(self.storefile)
+
+
+class StreamingXMLMixin:
+    """Mixin reading units by streaming the XML file.
+
+    Units are copied out of the document while it is being parsed, so the
+    parser keeps only the unit being read instead of the whole document tree.
+    The copied units are still kept in a list, as monolingual lookups index
+    all of them and they have to be bound to the document once it is parsed.
+    The whole document tree is parsed only once the store is needed for
+    modifications.
+    """
+
+    def __init__(
+        self, storefile, template_store=None, language_code=None, is_template=False
+    ):
+        self.parsed_store = None
+        self.streamed_units = None
+        self.store_language_code = language_code
+        # TTKitFormat.__init__ is skipped as it needs the parsed store
+        TranslationFormat.__init__(
+            self, storefile, template_store, language_code, is_template
+        )
+        if self.parsed_store is None:
+            self.streamed_units = list(self.stream_units(storefile))
+        else:
+            self.setup_store(self.parsed_store)
+
+    @classmethod
+    def load(cls, storefile):
+        """Load file using defined loader, files on disk are parsed on demand."""
+        if isinstance(storefile, str):
+            return None
+        return super().load(storefile)
+
+    @property
+    def store(self):
+        """Return Translate Toolkit store, parsing the file if needed."""
+        if self.parsed_store is None:
+            self.parsed_store = self.parse_store(self.storefile)
+            self.setup_store(self.parsed_store)
+            self.bind_units(self.parsed_store)
+        return self.parsed_store
+
+    @store.setter
+    def store(self, store):
+        self.parsed_store = store
+
+    def load_document(self):
+        """Parse whole document to allow modifications."""
+        return self.store
+
+    def setup_store(self, store):
+        # Set language (needed for some which do not include this)
+        language_code = self.store_language_code
+        if language_code is not None and store.gettargetlanguage() is None:
+            store.settargetlanguage(self.get_language_code(language_code))
+
+    def bind_units(self, store):
+        """Bind streamed units to elements of the parsed document."""
+        elements = {}
+        for unit in reversed(store.units):
+            elements.setdefault(unit.getid(), []).append(unit.xmlelement)
+        for unit in self.streamed_units:
+            matching = elements.get(unit.getid())
+            if matching:
+                unit.xmlelement = matching.pop()
+        self.streamed_units = None
+
+    def stream_units(self, filename):
+        """Yield Translate Toolkit units parsed from the file."""
+        raise NotImplementedError()
+
+    @property
+    def all_store_units(self):
+        """Wrapper for all store units, streamed ones until the file is parsed."""
+        if self.parsed_store is None:
+            return self.streamed_units
+        return self.parsed_store.units
+
+    def is_valid(self):
+        """Check whether store seems to be valid."""
+        return self.parsed_store is not None or self.streamed_units is not None
+
+
 class PropertiesUnit(KeyValueUnit):
     """Wrapper for properties based units."""
 
@@ -601,6 +839,70 @@ class FlatXMLUnit(TTKitUnit):
     def source(self):
         return self.mainunit.target
 
+    def set_target(self, target):
+        """Set translation unit target."""
+        # Streamed units have to be bound to the parsed document first
+        self.parent.load_document()
+        super().set_target(target)
+
+
+class StreamedFlatXMLUnit(BaseFlatXMLUnit):
+    """Flat XML unit detached from the document it was parsed from.
+
+    Only serialized element is kept, the element itself is created on demand
+    until the unit is bound to the parsed document.
+    """
+
+    def __init__(
+        self, element, namespace=None, element_name="str", attribute_name="key"
+    ):
+        # The parent constructor is skipped as it creates new element
+        self.namespace = namespace
+        self.element_name = element_name
+        self.attribute_name = attribute_name
+        self.bound_element = None
+        self.serialized = etree.tostring(element, encoding="utf-8", with_tail=False)
+        self.streamed_source = element.get(attribute_name)
+        self.streamed_target = getText(element)
+
+    @property
+    def xmlelement(self):
+        if self.bound_element is None:
+            return etree.fromstring(self.serialized)
+        return self.bound_element
+
+    @xmlelement.setter
+    def xmlelement(self, element):
+        self.bound_element = element
+
+    @property
+    def source(self):
+        if self.bound_element is None:
+            return self.streamed_source
+        return self.bound_element.get(self.attribute_name)
+
+    @source.setter
+    def source(self, source):
+        self.xmlelement.set(self.attribute_name, source)
+
+    @property
+    def target(self):
+        if self.bound_element is None:
+            return self.streamed_target
+        return getText(self.bound_element)
+
+    @target.setter
+    def target(self, target):
+        BaseFlatXMLUnit.target.fset(self, target)
+
+    def __deepcopy__(self, memo):
+        return BaseFlatXMLUnit.createfromxmlElement(
+            deepcopy(self.xmlelement, memo),
+            namespace=self.namespace,
+            element_name=self.element_name,
+            attribute_name=self.attribute_name,
+        )
+
 
 class MonolingualIDUnit(TTKitUnit):
     @cached_property
@@ -783,28 +1085,9 @@ class BasePoFormat(TTKitFormat, BilingualUpdateMixin):
         # is merged and relased in the Translate Toolkit
         return bool(self.store.units)
 
-    def get_plural(self, language):
-        """Return matching plural object."""
-        from weblate.lang.models import Plural
-
-        header = self.store.parseheader()
-        try:
-            number, formula = Plural.parse_plural_forms(header["Plural-Forms"])
-        except (ValueError, KeyError):
-            return super().get_plural(language)
-
-        # Find matching one
-        for plural in language.plural_set.iterator():
-            if plural.same_plural(number, formula):
-                return plural
-
-        # Create new one
-        return Plural.objects.create(
-            language=language,
-            source=Plural.SOURCE_GETTEXT,
-            number=number,
-            formula=formula,
-        )
+    def get_plural_forms(self):
+        """Return plural forms definition from the header."""
+        return self.store.parseheader().get("Plural-Forms")
 
     @classmethod
     def untranslate_store(cls, store, language, fuzzy=False):
@@ -901,6 +1184,7 @@ class TSFormat(TTKitFormat):
     loader = tsfile
     autoload = ("*.ts",)
     unit_class = TSUnit
+    can_cache_store = False
 
     @classmethod
     def untranslate_store(cls, store, language, fuzzy=False):
@@ -918,6 +1202,7 @@ class XliffFormat(TTKitFormat):
     autoload = ("*.xlf", "*.xliff")
     unit_class = XliffUnit
     language_format = "bcp"
+    can_cache_store = False
 
     def create_unit(self, key, source):
         unit = super().create_unit(key, source)
@@ -1058,9 +1343,10 @@ class RESXFormat(TTKitFormat):
     unit_class = RESXUnit
     new_translation = RESXFile.XMLskeleton
     autoload = ("*.resx",)
+    can_cache_store = False
 
 
-class AndroidFormat(TTKitFormat):
+class AndroidFormat(IncrementalXMLMixin, TTKitFormat):
     name = _("Android String Resource")
     format_id = "aresource"
     loader = ("aresource", "AndroidResourceFile")
@@ -1069,6 +1355,14 @@ class AndroidFormat(TTKitFormat):
     new_translation = '<?xml version="1.0" encoding="utf-8"?>\n<resources></resources>'
     autoload = ("strings*.xml", "values*.xml")
     language_format = "android"
+    can_cache_store = False
+
+    def prepare_element(self, element):
+        """Indent rebuilt plurals same way as serializing whole file does."""
+        level = sum(1 for _parent in element.iterancestors())
+        reindent(
+            element, level, indent="    ", toplevel=False, leaves=("string", "item")
+        )
 
 
 class JSONFormat(TTKitFormat):
@@ -1136,6 +1430,7 @@ class CSVFormat(TTKitFormat):
     unit_class = CSVUnit
     autoload = ("*.csv",)
     encoding = "auto"
+    can_cache_store = False
 
     def __init__(
         self, storefile, template_store=None, language_code=None, is_template=False
@@ -1335,7 +1630,7 @@ class SubStationAlphaFormat(SubRipFormat):
     autoload = ("*.ssa",)
 
 
-class FlatXMLFormat(TTKitFormat):
+class FlatXMLFormat(IncrementalXMLMixin, StreamingXMLMixin, TTKitFormat):
     name = _("Flat XML file")
     format_id = "flatxml"
     loader = ("flatxml", "FlatXMLFile")
@@ -1343,6 +1638,46 @@ class FlatXMLFormat(TTKitFormat):
     unit_class = FlatXMLUnit
     new_translation = '<?xml version="1.0" encoding="utf-8"?>\n<root></root>'
 
+    def stream_units(self, filename):
+        """Yield Translate Toolkit units parsed from the file."""
+        store = self.get_class()(**self.get_class_kwargs())
+        root_tag = store.namespaced(store.root_name)
+        value_tag = store.namespaced(store.value_name)
+        root = None
+        children = matched = 0
+        for event, element in etree.iterparse(
+            filename,
+            events=("start", "end"),
+            resolve_entities=False,
+            strip_cdata=False,
+        ):
+            if root is None:
+                if element.tag != root_tag:
+                    raise ValueError(
+                        "expected root name to be {} but got {}".format(
+                            root_tag, element.tag
+                        )
+                    )
+                root = element
+            elif event == "end" and element.getparent() is root:
+                children += 1
+                if element.tag == value_tag:
+                    matched += 1
+                    yield StreamedFlatXMLUnit(
+                        element,
+                        namespace=store.namespace,
+                        element_name=store.value_name,
+                        attribute_name=store.key_name,
+                    )
+                # Free already processed part of the document
+                element.clear()
+                while element.getprevious() is not None:
+                    del root[0]
+        if children and not matched:
+            raise ValueError(
+                "expected value name to be {} but no such node found".format(value_tag)
+            )
+
 
 class INIFormat(TTKitFormat):
     name = _("INI file")
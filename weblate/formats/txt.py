@@ -196,7 +196,7 @@ class AppStoreFormat(TranslationFormat):
         """Handle creation of new translation file."""
         os.makedirs(filename)
 
-    def add_unit(self, ttkit_unit):
+    def _add_unit(self, ttkit_unit):
         """Add new unit to underlaying store."""
         self.store.units.append(ttkit_unit)
 
@@ -19,14 +19,17 @@
 
 
 import re
+from collections import OrderedDict
 from functools import reduce
 from itertools import islice
+from uuid import uuid4
 
 from django.conf import settings
+from django.core.cache import cache
 from django.db import models
-from django.db.models import Value, F, Q, CharField
+from django.db.models import Q
 from django.db.models.functions import Lower
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.urls import reverse
 from django.utils.translation import gettext_lazy
@@ -39,6 +42,7 @@ from weblate.formats.auto import AutodetectFormat
 from weblate.lang.models import Language
 from weblate.trans.defines import GLOSSARY_LENGTH, PROJECT_NAME_LENGTH
 from weblate.trans.models.project import Project
+from weblate.utils.automaton import Automaton
 from weblate.utils.colors import COLOR_CHOICES
 from weblate.utils.db import re_escape
 from weblate.utils.decorators import disable_for_loaddata
@@ -46,6 +50,11 @@ from weblate.utils.errors import report_error
 
 SPLIT_RE = re.compile(r"[\s,.:!?]+", re.UNICODE)
 
+# Number of per project and language automatons kept in the process
+AUTOMATON_CACHE_SIZE = 50
+
+AUTOMATON_CACHE = OrderedDict()
+
 WORDS_EXCLUDE_SET = set(["le", "la", "the", "a", "an", "on", "of", "and", "in", "points", "damage", "level", "attack"])
 
 
@@ -165,21 +174,21 @@ class TermQuerySet(models.QuerySet):
         return self.filter(glossary__in=Glossary.objects.for_project(project))
 
     def get_terms(self, unit):
-        """Return list of term pairs for an unit."""
-        sql = (
-            "SELECT gt.* "
-            "FROM glossary_term gt "
-            "LEFT JOIN glossary_glossary gg ON gt.glossary_id = gg.id "
-            "WHERE gg.project_id = %s AND %s ILIKE '%%'||gt.source||'%%';"
-        )
-        # return self.raw(sql, [unit.translation.component.project.id, unit.source])
-    
+        """Return list of term pairs for an unit.
+
+        The terms are matched as case insensitive substrings of the source
+        using compiled automaton, so the lookup does not depend on glossary
+        size.
+        """
+        project = unit.translation.component.project
+        language = unit.translation.language
+        automaton = get_automaton(project.id, language.id)
+
         return self.filter(
-                        glossary__project=unit.translation.component.project.id, 
-                        language=unit.translation.language
-                    ).annotate(
-                        querystring=Value(unit.source, output_field=CharField())
-                    ).filter(querystring__icontains=F('source'))
+            pk__in=automaton.values(unit.source.lower()),
+            glossary__project=project,
+            language=language,
+        )
 
         words = set()
         source_language = unit.translation.component.project.source_language
@@ -255,6 +264,44 @@ class TermQuerySet(models.QuerySet):
         return self.order_by(Lower("source"))
 
 
+def get_automaton_cache_key(project_id, language_id):
+    return "glossary-automaton-{}-{}".format(project_id, language_id)
+
+
+def get_automaton(project_id, language_id):
+    """Return compiled glossary matcher for project and language.
+
+    The automaton is kept in the process memory, the shared cache only holds
+    its version so that changes in other processes are noticed.
+    """
+    key = get_automaton_cache_key(project_id, language_id)
+    version = cache.get(key)
+    if version is None:
+        version = uuid4().hex
+        cache.set(key, version, None)
+
+    cached = AUTOMATON_CACHE.get(key)
+    if cached is not None and cached[0] == version:
+        AUTOMATON_CACHE.move_to_end(key)
+        return cached[1]
+
+    terms = Term.objects.filter(
+        glossary__project_id=project_id, language_id=language_id
+    ).values_list("pk", "source")
+    automaton = Automaton(
+        (source.lower(), pk) for pk, source in terms.iterator()
+    ).build()
+
+    AUTOMATON_CACHE[key] = (version, automaton)
+    while len(AUTOMATON_CACHE) > AUTOMATON_CACHE_SIZE:
+        AUTOMATON_CACHE.popitem(last=False)
+    return automaton
+
+
+def invalidate_automaton(project_id, language_id):
+    cache.delete(get_automaton_cache_key(project_id, language_id))
+
+
 class Term(models.Model):
     glossary = models.ForeignKey(
         Glossary,
@@ -310,6 +357,13 @@ class Term(models.Model):
         )
 
 
+@receiver(post_save, sender=Term)
+@receiver(post_delete, sender=Term)
+def term_changed(sender, instance, **kwargs):
+    """Invalidates glossary matcher on term change."""
+    invalidate_automaton(instance.glossary.project_id, instance.language_id)
+
+
 @receiver(post_save, sender=Project)
 @disable_for_loaddata
 def create_glossary(sender, instance, created, **kwargs):
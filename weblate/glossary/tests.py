@@ -346,6 +346,29 @@ class GlossaryTest(FixtureTestCase):
         )
         self.assertEqual(Term.objects.get_terms(unit).count(), 4)
 
+    def test_get_terms_delete(self):
+        translation = self.get_translation()
+        term = Term.objects.create(
+            self.user,
+            glossary=self.glossary,
+            language=translation.language,
+            source="Thank",
+            target="děkujeme",
+        )
+        unit = self.get_unit("Thank you for using Weblate.")
+        self.assertEqual(Term.objects.get_terms(unit).count(), 1)
+        term.source = "Weblate"
+        term.save()
+        self.assertEqual(Term.objects.get_terms(unit).count(), 1)
+        term.source = "hello"
+        term.save()
+        self.assertEqual(Term.objects.get_terms(unit).count(), 0)
+        term.source = "USING"
+        term.save()
+        self.assertEqual(Term.objects.get_terms(unit).count(), 1)
+        term.delete()
+        self.assertEqual(Term.objects.get_terms(unit).count(), 0)
+
     def test_get_long(self):
         """Test parsing long source string."""
         unit = self.get_unit()
@@ -53,11 +53,16 @@ class WeblateTranslation(MachineTranslation):
             state__gte=STATE_TRANSLATED,
         )
 
-        for munit in matching_units:
-            source = munit.get_source_plurals()[0]
-            quality = self.comparer.similarity(text, source)
-            if quality < 10 or (quality < 75 and not search):
+        threshold = 10 if search else 75
+        matching_units = list(matching_units)
+        qualities = self.comparer.similarity_many(
+            text, [munit.get_source_plurals()[0] for munit in matching_units], threshold
+        )
+
+        for munit, quality in zip(matching_units, qualities):
+            if quality < threshold:
                 continue
+            source = munit.get_source_plurals()[0]
             yield {
                 "text": munit.get_target_plurals()[0],
                 "quality": quality,
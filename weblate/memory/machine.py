@@ -19,7 +19,6 @@
 
 from weblate.machinery.base import MachineTranslation, get_machinery_language
 from weblate.memory.models import Memory
-from weblate.utils.search import Comparer
 
 
 class WeblateMemory(MachineTranslation):
@@ -45,17 +44,21 @@ class WeblateMemory(MachineTranslation):
 
     def download_translations(self, source, language, text, unit, user, search):
         """Download list of possible translations from a service."""
-        comparer = Comparer()
-        for result in Memory.objects.lookup(
+        threshold = 10 if search else 75
+        results = Memory.objects.lookup(
             source,
             language,
             text,
             user,
             unit.translation.component.project,
             unit.translation.component.project.use_shared_tm,
-        ).iterator():
-            quality = comparer.similarity(text, result.source)
-            if quality < 10 or (quality < 75 and not search):
+            threshold,
+        )
+        qualities = self.comparer.similarity_many(
+            text, [result.source for result in results], threshold
+        )
+        for result, quality in zip(results, qualities):
+            if quality < threshold:
                 continue
             yield {
                 "text": result.target,
@@ -23,6 +23,7 @@ import argparse
 from django.core.management.base import CommandError
 
 from weblate.memory.models import Memory, MemoryImportError
+from weblate.memory.tasks import schedule_memory_import
 from weblate.utils.management.base import BaseCommand
 
 
@@ -37,6 +38,12 @@ class Command(BaseCommand):
             "--language-map",
             help="Map language codes in the TMX to Weblate, for example en_US:en",
         )
+        parser.add_argument(
+            "--background",
+            action="store_true",
+            default=False,
+            help="Perform the import in a background task",
+        )
         parser.add_argument(
             "file", type=argparse.FileType("rb"), help="File to import (TMX or JSON)"
         )
@@ -52,6 +59,11 @@ class Command(BaseCommand):
                 )
             }
 
+        if options["background"]:
+            task = schedule_memory_import(options["file"], langmap)
+            self.stdout.write("Import scheduled as task {}".format(task.id))
+            return
+
         try:
             Memory.objects.import_file(None, options["file"], langmap)
         except MemoryImportError as error:
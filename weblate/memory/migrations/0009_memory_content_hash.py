@@ -0,0 +1,52 @@
+# Generated by Django 3.0.7 on 2020-06-22 10:12
+
+from django.db import migrations, models
+
+from weblate.memory.utils import get_memory_hash
+
+
+def fill_hash(apps, schema_editor):
+    Memory = apps.get_model("memory", "Memory")
+    seen = set()
+    duplicates = []
+    update = []
+    for memory in Memory.objects.order_by("pk").iterator():
+        memory.content_hash = get_memory_hash(
+            memory.source_language_id,
+            memory.target_language_id,
+            memory.source,
+            memory.target,
+            memory.origin,
+            memory.from_file,
+            memory.shared,
+            memory.project_id,
+            memory.user_id,
+        )
+        if memory.content_hash in seen:
+            duplicates.append(memory.pk)
+            continue
+        seen.add(memory.content_hash)
+        update.append(memory)
+        if len(update) > 1000:
+            Memory.objects.bulk_update(update, ["content_hash"])
+            update = []
+    if update:
+        Memory.objects.bulk_update(update, ["content_hash"])
+    for pos in range(0, len(duplicates), 1000):
+        Memory.objects.filter(pk__in=duplicates[pos : pos + 1000]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("memory", "0008_adjust_similarity"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="memory",
+            name="content_hash",
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.RunPython(fill_hash, migrations.RunPython.noop, elidable=True),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.0.7 on 2020-06-22 10:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("memory", "0009_memory_content_hash"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="memory",
+            name="content_hash",
+            field=models.BigIntegerField(unique=True),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 3.0.7 on 2020-06-23 08:41
+
+from django.db import migrations, models
+
+from weblate.memory.utils import get_source_hash
+
+
+def fill_hash(apps, schema_editor):
+    Memory = apps.get_model("memory", "Memory")
+    update = []
+    for memory in Memory.objects.order_by("pk").iterator():
+        memory.source_hash = get_source_hash(
+            memory.source_language_id, memory.target_language_id, memory.source
+        )
+        update.append(memory)
+        if len(update) > 1000:
+            Memory.objects.bulk_update(update, ["source_hash"])
+            update = []
+    if update:
+        Memory.objects.bulk_update(update, ["source_hash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("memory", "0010_unique_content_hash"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="memory",
+            name="source_hash",
+            field=models.BigIntegerField(null=True),
+        ),
+        migrations.RunPython(fill_hash, migrations.RunPython.noop, elidable=True),
+    ]
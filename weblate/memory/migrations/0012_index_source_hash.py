@@ -0,0 +1,18 @@
+# Generated by Django 3.0.7 on 2020-06-23 08:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("memory", "0011_memory_source_hash"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="memory",
+            name="source_hash",
+            field=models.BigIntegerField(db_index=True),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 3.0.7 on 2020-06-24 12:05
+
+from django.db import migrations, models
+from django.db.models.functions import Length
+
+
+def fill_length(apps, schema_editor):
+    Memory = apps.get_model("memory", "Memory")
+    Memory.objects.update(source_length=Length("source"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("memory", "0012_index_source_hash"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="memory",
+            name="source_length",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(fill_length, migrations.RunPython.noop, elidable=True),
+        migrations.AlterIndexTogether(
+            name="memory",
+            index_together={("source_language", "target_language", "source_length")},
+        ),
+    ]
@@ -18,19 +18,22 @@
 #
 
 
+import codecs
 import json
 import os
+import re
 from functools import reduce
 
+from celery import current_task
 from django.conf import settings
-from django.db import models
+from django.db import connection, models
 from django.utils.encoding import force_str
 from django.utils.translation import gettext as _
 from django.utils.translation import pgettext
 from jsonschema import validate
 from jsonschema.exceptions import ValidationError
-from translate.misc.xml_helpers import getXMLlang, getXMLspace
-from translate.storage.tmx import tmxfile
+from lxml import etree
+from translate.misc.xml_helpers import getText, getXMLlang, getXMLspace
 from weblate_schemas import load_schema
 
 from weblate.lang.models import Language
@@ -39,24 +42,102 @@ from weblate.memory.utils import (
     CATEGORY_PRIVATE_OFFSET,
     CATEGORY_SHARED,
     CATEGORY_USER_OFFSET,
+    get_length_range,
+    get_memory_hash,
+    get_source_hash,
 )
+from weblate.utils.db import PostgreSQLSimilarity
 from weblate.utils.errors import report_error
 
 
+# Number of memory entries inserted at once
+BATCH_SIZE = 1000
+
+# Number of fuzzy match candidates fetched from the database
+LOOKUP_CANDIDATES = 50
+
+JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
 class MemoryImportError(Exception):
     pass
 
 
-def get_node_data(unit, node):
-    """Generic implementation of LISAUnit.gettarget."""
+def get_node_data(node, xml_space):
+    """Return language and text of TMX tuv element."""
     # The language should be present as xml:lang, but in some
     # cases it's there only as lang
+    segment = node.find("seg")
     return (
         getXMLlang(node) or node.get("lang"),
-        unit.getNodeText(node, getXMLspace(unit.xmlelement, "preserve")),
+        getText(segment, xml_space) if segment is not None else None,
     )
 
 
+def get_file_size(fileobj):
+    try:
+        return os.fstat(fileobj.fileno()).st_size
+    except (AttributeError, OSError, ValueError):
+        return getattr(fileobj, "size", 0)
+
+
+def set_progress(fileobj, size):
+    """Report position in the imported file as Celery task progress."""
+    if current_task and current_task.request.id and size:
+        current_task.update_state(
+            state="PROGRESS", meta={"progress": 100 * fileobj.tell() // size}
+        )
+
+
+def iterate_json(fileobj, chunk_size=65536):
+    """Incrementally parse JSON array, yielding its items."""
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    pos = 0
+    eof = False
+    # One of start, value, next and first (value or end of array)
+    expect = "start"
+
+    while True:
+        pos = JSON_WHITESPACE.match(buffer, pos).end()
+        if pos < len(buffer):
+            char = buffer[pos]
+            if expect == "start":
+                if char != "[":
+                    raise ValueError("Expecting JSON array")
+                pos += 1
+                expect = "first"
+                continue
+            if char == "]" and expect in ("first", "next"):
+                return
+            if expect == "next":
+                if char != ",":
+                    raise ValueError("Expecting ',' delimiter: char {}".format(pos))
+                pos += 1
+                expect = "value"
+                continue
+            try:
+                value, pos = decoder.raw_decode(buffer, pos)
+            except ValueError:
+                if eof:
+                    raise
+            else:
+                yield value
+                expect = "next"
+                continue
+        elif eof:
+            raise ValueError("Unexpected end of JSON data")
+
+        # Read more data, keeping not yet parsed part of the buffer
+        chunk = fileobj.read(chunk_size)
+        eof = not chunk
+        if isinstance(chunk, bytes):
+            chunk = text_decoder.decode(chunk, final=eof)
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+
 class MemoryQuerySet(models.QuerySet):
     def filter_type(self, user=None, project=None, use_shared=False, from_file=False):
         query = []
@@ -70,8 +151,23 @@ class MemoryQuerySet(models.QuerySet):
             query.append(models.Q(user=user))
         return self.filter(reduce(lambda x, y: x | y, query))
 
-    def lookup(self, source_language, target_language, text, user, project, use_shared):
-        return self.filter_type(
+    def lookup(
+        self,
+        source_language,
+        target_language,
+        text,
+        user,
+        project,
+        use_shared,
+        threshold=10,
+    ):
+        """Return exact matches followed by fuzzy match candidates.
+
+        The candidates are limited to source lengths which can reach the
+        similarity threshold and fetched using trigram index (full-text index
+        on MySQL), ordered by the trigram similarity where available.
+        """
+        base = self.filter_type(
             # Type filtering
             user=user,
             project=project,
@@ -81,11 +177,26 @@ class MemoryQuerySet(models.QuerySet):
             # Language filtering
             source_language=source_language,
             target_language=target_language,
-            # Full-text search on source
-            source__search=text,
-        )[
-            :50
+        )
+        exact = [
+            memory
+            for memory in base.filter(
+                source_hash=get_source_hash(
+                    source_language.id, target_language.id, text
+                )
+            )[:LOOKUP_CANDIDATES]
+            # Ignore possible hash collisions
+            if memory.source == text
         ]
+        fuzzy = base.filter(
+            source_length__range=get_length_range(len(text), threshold),
+            source__search=text,
+        ).exclude(pk__in=[memory.pk for memory in exact])
+        if connection.vendor == "postgresql":
+            fuzzy = fuzzy.annotate(
+                similarity=PostgreSQLSimilarity("source", models.Value(text))
+            ).order_by("-similarity")
+        return exact + list(fuzzy[: LOOKUP_CANDIDATES - len(exact)])
 
     def prefetch_lang(self):
         return self.prefetch_related("source_language", "target_language")
@@ -109,92 +220,149 @@ class MemoryManager(models.Manager):
         return result
 
     def import_json(self, request, fileobj, origin=None, **kwargs):
-        content = fileobj.read()
-        try:
-            data = json.loads(force_str(content))
-        except ValueError as error:
-            report_error(cause="Failed to parse memory")
-            raise MemoryImportError(_("Failed to parse JSON file: {!s}").format(error))
-        try:
-            validate(data, load_schema("weblate-memory.schema.json"))
-        except ValidationError as error:
-            report_error(cause="Failed to validate memory")
-            raise MemoryImportError(_("Failed to parse JSON file: {!s}").format(error))
+        schema = load_schema("weblate-memory.schema.json")
+        size = get_file_size(fileobj)
         found = 0
         lang_cache = {}
-        for entry in data:
+        items = iterate_json(fileobj)
+        while True:
             try:
-                self.update_entry(
-                    source_language=Language.objects.get_by_code(
-                        entry["source_language"], lang_cache
-                    ),
-                    target_language=Language.objects.get_by_code(
-                        entry["target_language"], lang_cache
-                    ),
-                    source=entry["source"],
-                    target=entry["target"],
-                    origin=origin,
-                    **kwargs
+                data = [item for _unused, item in zip(range(BATCH_SIZE), items)]
+            except ValueError as error:
+                report_error(cause="Failed to parse memory")
+                raise MemoryImportError(
+                    _("Failed to parse JSON file: {!s}").format(error)
                 )
-                found += 1
-            except Language.DoesNotExist:
-                continue
-        return found
+            if not data:
+                return found
+            try:
+                validate(data, schema)
+            except ValidationError as error:
+                report_error(cause="Failed to validate memory")
+                raise MemoryImportError(
+                    _("Failed to parse JSON file: {!s}").format(error)
+                )
+            entries = []
+            for entry in data:
+                try:
+                    entries.append(
+                        dict(
+                            source_language=Language.objects.get_by_code(
+                                entry["source_language"], lang_cache
+                            ),
+                            target_language=Language.objects.get_by_code(
+                                entry["target_language"], lang_cache
+                            ),
+                            source=entry["source"],
+                            target=entry["target"],
+                            origin=origin,
+                            **kwargs
+                        )
+                    )
+                except Language.DoesNotExist:
+                    continue
+            self.bulk_add(entries)
+            found += len(entries)
+            set_progress(fileobj, size)
 
     def import_tmx(self, request, fileobj, origin=None, langmap=None, **kwargs):
         if not kwargs:
             kwargs = {"from_file": True}
-        try:
-            storage = tmxfile.parsefile(fileobj)
-        except (SyntaxError, AssertionError):
-            report_error(cause="Failed to parse")
-            raise MemoryImportError(_("Failed to parse TMX file!"))
-        header = next(
-            storage.document.getroot().iterchildren(storage.namespaced("header"))
-        )
+        size = get_file_size(fileobj)
         lang_cache = {}
+        source_language = None
+        found = 0
+        entries = []
+
         try:
-            source_language = Language.objects.get_by_code(
-                header.get("srclang"), lang_cache, langmap
-            )
-        except Language.DoesNotExist:
-            raise MemoryImportError(_("Failed to find source language!"))
+            for event, element in etree.iterparse(
+                fileobj,
+                events=("start", "end"),
+                tag=("header", "tu"),
+                resolve_entities=False,
+            ):
+                if element.tag == "header":
+                    if event == "start":
+                        try:
+                            source_language = Language.objects.get_by_code(
+                                element.get("srclang"), lang_cache, langmap
+                            )
+                        except Language.DoesNotExist:
+                            raise MemoryImportError(
+                                _("Failed to find source language!")
+                            )
+                    continue
+                if event != "end":
+                    continue
+                if source_language is None:
+                    raise MemoryImportError(_("Failed to find source language!"))
 
-        found = 0
-        for unit in storage.units:
-            # Parse translations (translate-toolkit does not care about
-            # languages here, it just picks first and second XML elements)
-            translations = {}
-            for node in unit.getlanguageNodes():
-                lang_code, text = get_node_data(unit, node)
-                if not lang_code or not text:
+                # Parse translations
+                translations = {}
+                xml_space = getXMLspace(element, "preserve")
+                for node in element.iterchildren("tuv"):
+                    lang_code, text = get_node_data(node, xml_space)
+                    if not lang_code or not text:
+                        continue
+                    language = Language.objects.get_by_code(
+                        lang_code, lang_cache, langmap
+                    )
+                    translations[language.code] = text
+
+                # Free memory used by already processed elements
+                element.clear()
+                while element.getprevious() is not None:
+                    del element.getparent()[0]
+
+                try:
+                    source = translations.pop(source_language.code)
+                except KeyError:
+                    # Skip if source language is not present
                     continue
-                language = Language.objects.get_by_code(lang_code, lang_cache, langmap)
-                translations[language.code] = text
 
-            try:
-                source = translations.pop(source_language.code)
-            except KeyError:
-                # Skip if source language is not present
-                continue
+                for lang, text in translations.items():
+                    entries.append(
+                        dict(
+                            source_language=source_language,
+                            target_language=Language.objects.get_by_code(
+                                lang, lang_cache, langmap
+                            ),
+                            source=source,
+                            target=text,
+                            origin=origin,
+                            **kwargs
+                        )
+                    )
+                if len(entries) >= BATCH_SIZE:
+                    self.bulk_add(entries)
+                    found += len(entries)
+                    entries = []
+                    set_progress(fileobj, size)
+        except etree.XMLSyntaxError:
+            report_error(cause="Failed to parse")
+            raise MemoryImportError(_("Failed to parse TMX file!"))
 
-            for lang, text in translations.items():
-                self.update_entry(
-                    source_language=source_language,
-                    target_language=Language.objects.get_by_code(
-                        lang, lang_cache, langmap
-                    ),
-                    source=source,
-                    target=text,
-                    origin=origin,
-                    **kwargs
-                )
-                found += 1
-        return found
+        if source_language is None:
+            raise MemoryImportError(_("Failed to parse TMX file!"))
+
+        self.bulk_add(entries)
+        return found + len(entries)
 
     def update_entry(self, **kwargs):
-        if not self.filter(**kwargs).exists():
-            self.create(**kwargs)
+        self.bulk_add([kwargs])
+
+    def bulk_add(self, entries, batch_size=1000):
+        """Insert entries skipping already existing ones.
+
+        The entries are dicts with model fields, duplicates are detected by
+        the unique index on content_hash.
+        """
+        objects = {}
+        for entry in entries:
+            memory = Memory(**entry)
+            memory.update_lookup_fields()
+            objects[memory.content_hash] = memory
+        self.bulk_create(objects.values(), batch_size=batch_size, ignore_conflicts=True)
 
 
 class Memory(models.Model):
@@ -227,12 +395,39 @@ class Memory(models.Model):
     )
     from_file = models.BooleanField(db_index=True, default=False)
     shared = models.BooleanField(db_index=True, default=False)
+    content_hash = models.BigIntegerField(unique=True)
+    source_hash = models.BigIntegerField(db_index=True)
+    source_length = models.IntegerField(default=0)
 
     objects = MemoryManager.from_queryset(MemoryQuerySet)()
 
+    class Meta:
+        index_together = [("source_language", "target_language", "source_length")]
+
     def __str__(self):
         return "Memory: {}:{}".format(self.source_language, self.target_language)
 
+    def save(self, *args, **kwargs):
+        self.update_lookup_fields()
+        super().save(*args, **kwargs)
+
+    def update_lookup_fields(self):
+        self.source_length = len(self.source)
+        self.source_hash = get_source_hash(
+            self.source_language_id, self.target_language_id, self.source
+        )
+        self.content_hash = get_memory_hash(
+            self.source_language_id,
+            self.target_language_id,
+            self.source,
+            self.target,
+            self.origin,
+            self.from_file,
+            self.shared,
+            self.project_id,
+            self.user_id,
+        )
+
     def get_origin_display(self):
         if self.project:
             text = pgettext("Translation memory category", "Project: {}")
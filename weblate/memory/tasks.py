@@ -17,14 +17,82 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 
+import os
+from shutil import copyfileobj, rmtree
+from uuid import uuid4
+
 from django.db import transaction
+from django.utils.translation import ngettext
 
 from weblate.machinery.base import get_machinery_language
-from weblate.memory.models import Memory
+from weblate.memory.models import BATCH_SIZE, Memory, MemoryImportError
+from weblate.memory.utils import get_memory_hash
 from weblate.utils.celery import app
+from weblate.utils.data import data_dir
 from weblate.utils.state import STATE_TRANSLATED
 
 
+class MemoryUpdate:
+    """Translation memory entries queued for writing on transaction commit."""
+
+    def __init__(self):
+        self.entries = {}
+
+    def add(self, entries):
+        for entry in entries:
+            self.entries[entry["content_hash"]] = entry
+
+    def __call__(self):
+        if self.entries:
+            handle_memory_update.delay(list(self.entries.values()))
+
+    @classmethod
+    def get_pending(cls):
+        """Return update already scheduled in current transaction."""
+        connection = transaction.get_connection()
+        if not connection.in_atomic_block:
+            return None
+        for _sids, func in connection.run_on_commit:
+            if isinstance(func, cls):
+                return func
+        return None
+
+
+@app.task(trail=False)
+def handle_memory_update(entries):
+    Memory.objects.bulk_add(entries)
+
+
+@app.task(trail=False)
+def import_memory_file(filename, langmap=None, **kwargs):
+    """Import translation memory file stored by schedule_memory_import."""
+    try:
+        with open(filename, "rb") as handle:
+            found = Memory.objects.import_file(None, handle, langmap, **kwargs)
+    except MemoryImportError as error:
+        return str(error)
+    finally:
+        rmtree(os.path.dirname(filename))
+    return (
+        ngettext(
+            "Translation memory import completed, %d entry was imported.",
+            "Translation memory import completed, %d entries were imported.",
+            found,
+        )
+        % found
+    )
+
+
+def schedule_memory_import(fileobj, langmap=None, **kwargs):
+    """Store uploaded file for import and run it in the background."""
+    directory = data_dir("cache", "memory-import", uuid4().hex)
+    os.makedirs(directory)
+    filename = os.path.join(directory, os.path.basename(fileobj.name))
+    with open(filename, "wb") as handle:
+        copyfileobj(fileobj, handle)
+    return import_memory_file.delay(filename, langmap, **kwargs)
+
+
 @app.task(trail=False)
 def import_memory(project_id, component_id=None):
     from weblate.trans.models import Project, Unit
@@ -36,35 +104,64 @@ def import_memory(project_id, component_id=None):
         components = components.filter(id=component_id)
 
     for component in components.iterator():
-        with transaction.atomic():
-            units = Unit.objects.filter(
-                translation__component=component, state__gte=STATE_TRANSLATED
-            )
-            if not component.intermediate:
-                units = units.exclude(translation__language=project.source_language)
-            for unit in units.prefetch_related("translation", "translation__language"):
-                update_memory(None, unit, component, project)
+        units = Unit.objects.filter(
+            translation__component=component, state__gte=STATE_TRANSLATED
+        )
+        if not component.intermediate:
+            units = units.exclude(translation__language=project.source_language)
+        entries = []
+        for unit in units.prefetch_related("translation", "translation__language"):
+            entries.extend(get_memory_entries(None, unit, component, project))
+            if len(entries) >= BATCH_SIZE:
+                Memory.objects.bulk_add(entries)
+                entries = []
+        if entries:
+            Memory.objects.bulk_add(entries)
 
 
-def update_memory(user, unit, component=None, project=None):
+def get_memory_entries(user, unit, component=None, project=None):
+    """Return memory entries to store for an unit."""
     component = component or unit.translation.component
     project = project or component.project
     params = {
-        "source_language": get_machinery_language(project.source_language),
-        "target_language": get_machinery_language(unit.translation.language),
+        "source_language_id": get_machinery_language(project.source_language).id,
+        "target_language_id": get_machinery_language(unit.translation.language).id,
         "source": unit.source,
         "target": unit.target,
         "origin": component.full_slug,
     }
-
-    Memory.objects.update_entry(
-        user=None, project=project, from_file=False, shared=False, **params
-    )
+    types = [{"project_id": project.id}]
     if project.contribute_shared_tm:
-        Memory.objects.update_entry(
-            user=None, project=None, from_file=False, shared=True, **params
-        )
+        types.append({"shared": True})
     if user:
-        Memory.objects.update_entry(
-            user=user, project=None, from_file=False, shared=False, **params
-        )
+        types.append({"user_id": user.id})
+
+    result = []
+    for kind in types:
+        entry = {
+            "from_file": False,
+            "shared": False,
+            "project_id": None,
+            "user_id": None,
+        }
+        entry.update(params)
+        entry.update(kind)
+        entry["content_hash"] = get_memory_hash(**entry)
+        result.append(entry)
+    return result
+
+
+def update_memory(user, unit, component=None, project=None):
+    """Queue translation memory update for an unit.
+
+    Entries from one transaction are deduplicated and written in bulk in
+    a background task once the transaction is committed.
+    """
+    entries = get_memory_entries(user, unit, component, project)
+    update = MemoryUpdate.get_pending()
+    if update is not None:
+        update.add(entries)
+    else:
+        update = MemoryUpdate()
+        update.add(entries)
+        transaction.on_commit(update)
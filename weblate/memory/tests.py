@@ -30,9 +30,11 @@ from weblate_schemas import load_schema
 from weblate.lang.models import Language
 from weblate.memory.machine import WeblateMemory
 from weblate.memory.models import Memory
-from weblate.memory.utils import CATEGORY_FILE
+from weblate.memory.tasks import import_memory
+from weblate.memory.utils import CATEGORY_FILE, get_length_range
 from weblate.trans.tests.test_views import FixtureTestCase
 from weblate.trans.tests.utils import get_test_file
+from weblate.utils.state import STATE_TRANSLATED
 
 
 def add_document():
@@ -75,10 +77,75 @@ class MemoryModelTest(FixtureTestCase):
             ],
         )
 
+    def test_machine_fuzzy(self):
+        add_document()
+        unit = self.get_unit()
+        machine_translation = WeblateMemory()
+        self.assertEqual(
+            machine_translation.translate(unit, search="Hello!"),
+            [
+                {
+                    "quality": 83,
+                    "service": "Weblate Translation Memory",
+                    "origin": "File: test",
+                    "source": "Hello",
+                    "text": "Ahoj",
+                }
+            ],
+        )
+
+    def test_length_range(self):
+        self.assertEqual(get_length_range(100, 75), (75, 134))
+        self.assertEqual(get_length_range(10, 100), (10, 11))
+
+    def test_import_project(self):
+        unit = self.get_unit()
+        unit.translate(self.user, "Nazdar svete!\n", STATE_TRANSLATED)
+        Memory.objects.all().delete()
+        import_memory(self.project.id)
+        count = Memory.objects.count()
+        self.assertGreater(count, 0)
+        # Repeated import does not create duplicates
+        import_memory(self.project.id)
+        self.assertEqual(Memory.objects.count(), count)
+
+    def test_update_memory(self):
+        unit = self.get_unit()
+        unit.translate(self.user, "Nazdar svete!\n", STATE_TRANSLATED)
+        self.assertTrue(
+            Memory.objects.filter(
+                target="Nazdar svete!\n", project=self.project
+            ).exists()
+        )
+        self.assertTrue(
+            Memory.objects.filter(target="Nazdar svete!\n", user=self.user).exists()
+        )
+
     def test_import_tmx_command(self):
         call_command("import_memory", get_test_file("memory.tmx"))
         self.assertEqual(Memory.objects.count(), 2)
 
+    def test_import_tmx_twice(self):
+        call_command("import_memory", get_test_file("memory.tmx"))
+        call_command("import_memory", get_test_file("memory.tmx"))
+        self.assertEqual(Memory.objects.count(), 2)
+
+    def test_lookup_exact(self):
+        add_document()
+        self.assertEqual(
+            len(
+                Memory.objects.lookup(
+                    Language.objects.get(code="en"),
+                    Language.objects.get(code="cs"),
+                    "Hello",
+                    None,
+                    None,
+                    False,
+                )
+            ),
+            1,
+        )
+
     def test_import_tmx2_command(self):
         call_command("import_memory", get_test_file("memory2.tmx"))
         self.assertEqual(Memory.objects.count(), 1)
@@ -118,6 +185,10 @@ class MemoryModelTest(FixtureTestCase):
         call_command("import_memory", get_test_file("memory.json"))
         self.assertEqual(Memory.objects.count(), 1)
 
+    def test_import_background_command(self):
+        call_command("import_memory", get_test_file("memory.tmx"), background=True)
+        self.assertEqual(Memory.objects.count(), 2)
+
     def test_import_broken_json_command(self):
         with self.assertRaises(CommandError):
             call_command("import_memory", get_test_file("memory-broken.json"))
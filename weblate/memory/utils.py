@@ -17,6 +17,8 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 
+from weblate.utils.hash import calculate_hash
+
 CATEGORY_FILE = 1
 CATEGORY_SHARED = 2
 CATEGORY_PRIVATE_OFFSET = 10000000
@@ -36,3 +38,51 @@ def parse_category(category):
     if CATEGORY_PRIVATE_OFFSET <= category < CATEGORY_USER_OFFSET:
         return False, False, category - CATEGORY_PRIVATE_OFFSET, None
     return False, False, None, category - CATEGORY_USER_OFFSET
+
+
+def get_memory_hash(
+    source_language_id,
+    target_language_id,
+    source,
+    target,
+    origin,
+    from_file=False,
+    shared=False,
+    project_id=None,
+    user_id=None,
+):
+    """Calculate checksum identifying translation memory entry."""
+    return calculate_hash(
+        None,
+        "\x00".join(
+            str(item)
+            for item in (
+                source_language_id,
+                target_language_id,
+                source,
+                target,
+                origin,
+                int(from_file),
+                int(shared),
+                project_id,
+                user_id,
+            )
+        ),
+    )
+
+
+def get_source_hash(source_language_id, target_language_id, source):
+    """Calculate checksum for exact source lookups."""
+    return calculate_hash(
+        None, "\x00".join((str(source_language_id), str(target_language_id), source))
+    )
+
+
+def get_length_range(length, threshold):
+    """Return range of source lengths which can reach similarity threshold.
+
+    The edit distance is at least the length difference, so the strings can
+    not differ in length by more than (100 - threshold)% of the longer one.
+    """
+    ratio = max(threshold, 1) / 100
+    return int(length * ratio), int(length / ratio) + 1
@@ -18,6 +18,7 @@
 #
 
 
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import PermissionDenied
 from django.db.models import Count
@@ -31,6 +32,7 @@ from django.views.generic.base import TemplateView
 
 from weblate.memory.forms import DeleteForm, UploadForm
 from weblate.memory.models import Memory, MemoryImportError
+from weblate.memory.tasks import schedule_memory_import
 from weblate.utils import messages
 from weblate.utils.views import ErrorFormView, get_project
 from weblate.wladmin.views import MENU
@@ -46,6 +48,15 @@ def get_objects(request, kwargs):
     return {"user": request.user}
 
 
+def get_task_kwargs(objects):
+    """Convert objects filter to arguments passable to a Celery task."""
+    if "project" in objects:
+        return {"project_id": objects["project"].pk}
+    if "user" in objects:
+        return {"user_id": objects["user"].pk}
+    return objects
+
+
 def check_perm(user, permission, objects):
     if "project" in objects:
         return user.has_perm(permission, objects["project"])
@@ -88,6 +99,16 @@ class UploadView(MemoryFormView):
     def form_valid(self, form):
         if not check_perm(self.request.user, "memory.edit", self.objects):
             raise PermissionDenied()
+        if not settings.CELERY_TASK_ALWAYS_EAGER:
+            task = schedule_memory_import(
+                form.cleaned_data["file"], **get_task_kwargs(self.objects)
+            )
+            messages.success(
+                self.request,
+                _("Translation memory import in progress"),
+                "task:{}".format(task.id),
+            )
+            return super().form_valid(form)
         try:
             Memory.objects.import_file(
                 self.request, form.cleaned_data["file"], **self.objects
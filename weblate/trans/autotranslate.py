@@ -23,6 +23,7 @@ from django.db import transaction
 
 from weblate.machinery import MACHINE_TRANSLATION_SERVICES
 from weblate.trans.models import Change, Component, Suggestion, Unit
+from weblate.trans.models.unit import run_checks_many
 from weblate.utils.state import STATE_FUZZY, STATE_TRANSLATED
 
 
@@ -34,6 +35,7 @@ class AutoTranslate:
         self.mode = mode
         self.updated = 0
         self.total = 0
+        self.check_units = []
         self.target_state = STATE_FUZZY if mode == "fuzzy" else STATE_TRANSLATED
 
     def get_units(self):
@@ -52,10 +54,16 @@ class AutoTranslate:
         if self.mode == "suggest" or len(target) > unit.get_max_length():
             Suggestion.objects.add(unit, target, None, False)
         else:
-            unit.translate(self.user, target, state, Change.ACTION_AUTO, False)
+            # Checks are updated for all units at once in post_process
+            unit.defer_checks = True
+            if unit.translate(self.user, target, state, Change.ACTION_AUTO, False):
+                self.check_units.append(unit)
         self.updated += 1
 
     def post_process(self):
+        run_checks_many(self.check_units)
+        for unit in self.check_units:
+            unit.enforce_checks()
         if self.updated > 0:
             self.translation.invalidate_cache()
             if self.user:
@@ -22,6 +22,7 @@ from django.db import transaction
 
 from weblate.checks.flags import Flags
 from weblate.trans.models import Change, Component
+from weblate.trans.models.unit import run_checks_many
 from weblate.utils.state import STATE_EMPTY, STATE_READONLY
 
 
@@ -48,6 +49,7 @@ def bulk_perform(
     for component in components:
         component.preload_sources()
         with transaction.atomic(), component.lock():
+            check_units = []
             for unit in matching.filter(
                 translation__component=component
             ).select_for_update():
@@ -59,13 +61,16 @@ def bulk_perform(
                     and unit.state > STATE_EMPTY
                     and unit.state < STATE_READONLY
                 ):
-                    unit.translate(
+                    # Checks are updated for all units at once below
+                    unit.defer_checks = True
+                    if unit.translate(
                         user,
                         unit.target,
                         target_state,
                         change_action=Change.ACTION_BULK_EDIT,
                         propagate=False,
-                    )
+                    ):
+                        check_units.append(unit)
                 if add_flags or remove_flags:
                     flags = Flags(unit.source_info.extra_flags)
                     flags.merge(add_flags)
@@ -80,6 +85,10 @@ def bulk_perform(
                     unit.source_info.is_bulk_edit = True
                     unit.source_info.labels.remove(*remove_labels)
 
+            run_checks_many(check_units)
+            for unit in check_units:
+                unit.enforce_checks()
+
         component.invalidate_stats_deep()
 
     return updated
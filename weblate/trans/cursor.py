@@ -0,0 +1,122 @@
+#
+# Copyright © 2012 - 2020 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+import zlib
+from array import array
+from uuid import uuid4
+
+from django.core.cache import cache
+
+# Session key holding mapping of searches to cursor tokens
+SESSION_KEY = "search-cursors"
+
+# Number of cursors kept per session
+CURSOR_LIMIT = 10
+
+CURSOR_TTL = 86400
+
+
+class SearchCursor:
+    """Search results stored in the cache.
+
+    The session only holds short tokens referencing the results, the unit IDs
+    themselves are kept as compressed array in the cache entry. The cursor
+    behaves as read only sequence of unit IDs.
+    """
+
+    def __init__(self, key, token, ids, data):
+        self.key = key
+        self.token = token
+        self.ids = ids
+        self.data = data
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        return self.ids[index]
+
+    def index(self, unit_id):
+        return self.ids.index(unit_id)
+
+    @staticmethod
+    def get_cache_key(token):
+        return "search-cursor-{}".format(token)
+
+    @staticmethod
+    def get_cursors(session):
+        return session.get(SESSION_KEY, {})
+
+    @classmethod
+    def create(cls, session, key, ids, **data):
+        """Store search results and return cursor for them."""
+        ids = array("q", ids)
+        token = uuid4().hex
+        cache.set(
+            cls.get_cache_key(token),
+            dict(data, ids=zlib.compress(ids.tobytes())),
+            CURSOR_TTL,
+        )
+
+        cursors = cls.get_cursors(session)
+        cursors.pop(key, None)
+        cursors[key] = token
+
+        # Evict least recently used cursors
+        while len(cursors) > CURSOR_LIMIT:
+            cache.delete(cls.get_cache_key(cursors.pop(next(iter(cursors)))))
+
+        # Remove results stored directly in the session by older versions
+        for name in list(session.keys()):
+            if name.startswith("search_"):
+                del session[name]
+
+        session[SESSION_KEY] = cursors
+        return cls(key, token, ids, data)
+
+    @classmethod
+    def load(cls, session, key):
+        """Return cursor for the search or None if it has expired."""
+        cursors = cls.get_cursors(session)
+        token = cursors.get(key)
+        if token is None:
+            return None
+
+        data = cache.get(cls.get_cache_key(token))
+        if data is None:
+            del cursors[key]
+            session[SESSION_KEY] = cursors
+            return None
+
+        # Mark as recently used, the session is modified only when needed
+        if list(cursors)[-1] != key:
+            del cursors[key]
+            cursors[key] = token
+            session[SESSION_KEY] = cursors
+
+        ids = array("q")
+        ids.frombytes(zlib.decompress(data.pop("ids")))
+        return cls(key, token, ids, data)
+
+    def delete(self, session):
+        cache.delete(self.get_cache_key(self.token))
+        cursors = self.get_cursors(session)
+        if cursors.pop(self.key, None) is not None:
+            session[SESSION_KEY] = cursors
@@ -0,0 +1,142 @@
+#
+# Copyright © 2012 - 2020 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+import os
+from random import Random
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from weblate.formats.ttkit import AndroidFormat, PoFormat, XliffFormat
+from weblate.utils.management.base import BaseCommand
+
+PO_HEADER = """msgid ""
+msgstr ""
+"Content-Type: text/plain; charset=UTF-8\\n"
+"Language: cs\\n"
+
+"""
+
+XLIFF_HEADER = """<?xml version="1.0" encoding="utf-8"?>
+<xliff xmlns="urn:oasis:names:tc:xliff:document:1.2" version="1.2">
+<file original="benchmark" source-language="en" target-language="cs"
+  datatype="plaintext">
+<body>
+"""
+
+
+def write_po(filename, count):
+    with open(filename, "w") as handle:
+        handle.write(PO_HEADER)
+        for i in range(count):
+            handle.write(
+                'msgctxt "ctx{0}"\nmsgid "Source string {0}"\n'
+                'msgstr "Translated string {0}"\n\n'.format(i)
+            )
+
+
+def write_xliff(filename, count):
+    with open(filename, "w") as handle:
+        handle.write(XLIFF_HEADER)
+        for i in range(count):
+            handle.write(
+                '<trans-unit id="unit{0}"><source>Source string {0}</source>'
+                "<target>Translated string {0}</target></trans-unit>\n".format(i)
+            )
+        handle.write("</body>\n</file>\n</xliff>\n")
+
+
+def write_android(filename, count, step=1):
+    with open(filename, "w") as handle:
+        handle.write('<?xml version="1.0" encoding="utf-8"?>\n<resources>\n')
+        for i in range(0, count, step):
+            handle.write('<string name="key{0}">String {0}</string>\n'.format(i))
+        handle.write("</resources>\n")
+
+
+class Command(BaseCommand):
+    """Measure unit lookups in large translation files."""
+
+    help = "performs translation file unit lookup benchmark"
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--units", type=int, default=100000, help="number of units in the file"
+        )
+        parser.add_argument(
+            "--lookups", type=int, default=10000, help="number of measured lookups"
+        )
+
+    def report(self, name, parse, index, lookups, added):
+        self.stdout.write(
+            "{}: parse {:.3f}s, index {:.3f}s, lookup {:.2f}us, "
+            "added {} units".format(name, parse, index, lookups * 1000000, added)
+        )
+
+    def measure(self, keys, find_unit, store, lookups):
+        """Measure index build and average lookup time."""
+        start = perf_counter()
+        find_unit(*keys[0])
+        index = perf_counter() - start
+        sample = Random(0).choices(keys, k=lookups)
+        added = 0
+        start = perf_counter()
+        for key in sample:
+            unit, add = find_unit(*key)
+            if add:
+                store.add_unit(unit.unit)
+                added += 1
+        return index, (perf_counter() - start) / len(sample), added
+
+    def benchmark_bilingual(self, name, format_cls, filename, lookups):
+        start = perf_counter()
+        store = format_cls(filename)
+        parse = perf_counter() - start
+        keys = [(unit.context, unit.source) for unit in store.all_units]
+        store.__dict__.pop("_source_index", None)
+        self.report(name, parse, *self.measure(keys, store.find_unit, store, lookups))
+
+    def benchmark_monolingual(self, name, format_cls, template, filename, lookups):
+        start = perf_counter()
+        template_store = format_cls(template)
+        store = format_cls(filename, template_store)
+        parse = perf_counter() - start
+        keys = [(unit.context,) for unit in template_store.mono_units]
+        self.report(name, parse, *self.measure(keys, store.find_unit, store, lookups))
+
+    def handle(self, *args, **options):
+        count = options["units"]
+        lookups = options["lookups"]
+        with TemporaryDirectory() as tempdir:
+            filename = os.path.join(tempdir, "cs.po")
+            write_po(filename, count)
+            self.benchmark_bilingual("po", PoFormat, filename, lookups)
+
+            filename = os.path.join(tempdir, "cs.xliff")
+            write_xliff(filename, count)
+            self.benchmark_bilingual("xliff", XliffFormat, filename, lookups)
+
+            template = os.path.join(tempdir, "strings.xml")
+            write_android(template, count)
+            # Translation contains only half of the strings
+            filename = os.path.join(tempdir, "strings-cs.xml")
+            write_android(filename, count, 2)
+            self.benchmark_monolingual(
+                "aresource", AndroidFormat, template, filename, lookups
+            )
@@ -0,0 +1,151 @@
+#
+# Copyright © 2012 - 2020 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+from time import perf_counter
+
+from django.db.models import Count, Sum
+from django.db.models.functions import Length
+
+from weblate.trans.management.commands import WeblateLangCommand
+from weblate.trans.models import Unit
+from weblate.utils.db import conditional_sum
+from weblate.utils.state import (
+    STATE_APPROVED,
+    STATE_EMPTY,
+    STATE_FUZZY,
+    STATE_TRANSLATED,
+)
+
+
+def get_legacy_stats(translation):
+    """Calculate basic stats using separate queries for each relation."""
+    base = translation.unit_set
+    result = base.aggregate(
+        all=Count("id"),
+        all_words=Sum("num_words"),
+        all_chars=Sum(Length("source")),
+        fuzzy=conditional_sum(1, state=STATE_FUZZY),
+        fuzzy_words=conditional_sum("num_words", state=STATE_FUZZY),
+        fuzzy_chars=conditional_sum(Length("source"), state=STATE_FUZZY),
+        translated=conditional_sum(1, state__gte=STATE_TRANSLATED),
+        translated_words=conditional_sum("num_words", state__gte=STATE_TRANSLATED),
+        translated_chars=conditional_sum(Length("source"), state__gte=STATE_TRANSLATED),
+        todo=conditional_sum(1, state__lt=STATE_TRANSLATED),
+        todo_words=conditional_sum("num_words", state__lt=STATE_TRANSLATED),
+        todo_chars=conditional_sum(Length("source"), state__lt=STATE_TRANSLATED),
+        nottranslated=conditional_sum(1, state=STATE_EMPTY),
+        nottranslated_words=conditional_sum("num_words", state=STATE_EMPTY),
+        nottranslated_chars=conditional_sum(Length("source"), state=STATE_EMPTY),
+        approved=conditional_sum(1, state__gte=STATE_APPROVED),
+        approved_words=conditional_sum("num_words", state__gte=STATE_APPROVED),
+        approved_chars=conditional_sum(Length("source"), state__gte=STATE_APPROVED),
+        unlabeled=conditional_sum(1, labels__isnull=True),
+        unlabeled_words=conditional_sum("num_words", labels__isnull=True),
+        unlabeled_chars=conditional_sum(Length("source"), labels__isnull=True),
+    )
+    result.update(
+        Unit.objects.filter(
+            id__in=set(base.filter(check__dismissed=False).values_list("id", flat=True))
+        ).aggregate(
+            allchecks=Count("id"),
+            allchecks_words=Sum("num_words"),
+            allchecks_chars=Sum(Length("source")),
+            translated_checks=conditional_sum(1, state=STATE_TRANSLATED),
+            translated_checks_words=conditional_sum(
+                "num_words", state=STATE_TRANSLATED
+            ),
+            translated_checks_chars=conditional_sum(
+                Length("source"), state=STATE_TRANSLATED
+            ),
+        )
+    )
+    result.update(
+        Unit.objects.filter(
+            id__in=set(
+                base.filter(suggestion__isnull=False).values_list("id", flat=True)
+            )
+        ).aggregate(
+            suggestions=Count("id"),
+            suggestions_words=Sum("num_words"),
+            suggestions_chars=Sum(Length("source")),
+            approved_suggestions=conditional_sum(1, state__gte=STATE_APPROVED),
+            approved_suggestions_words=conditional_sum(
+                "num_words", state__gte=STATE_APPROVED
+            ),
+            approved_suggestions_chars=conditional_sum(
+                Length("source"), state__gte=STATE_APPROVED
+            ),
+        )
+    )
+    result.update(
+        Unit.objects.filter(
+            id__in=set(
+                base.filter(comment__resolved=False).values_list("id", flat=True)
+            )
+        ).aggregate(
+            comments=Count("id"),
+            comments_words=Sum("num_words"),
+            comments_chars=Sum(Length("source")),
+        )
+    )
+    return result
+
+
+class Command(WeblateLangCommand):
+    """Compare speed of translation stats calculation."""
+
+    help = "performs translation stats benchmark"
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=5,
+            help="number of iterations for each translation",
+        )
+
+    def measure(self, function, translation, iterations):
+        start = perf_counter()
+        for _unused in range(iterations):
+            result = function(translation)
+        return (perf_counter() - start) / iterations, result
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        for translation in self.get_translations(**options):
+            legacy_time, legacy = self.measure(
+                get_legacy_stats, translation, iterations
+            )
+            current_time, current = self.measure(
+                lambda obj: obj.stats.get_basic_stats(), translation, iterations
+            )
+            self.stdout.write(
+                "{}: legacy {:.4f}s, single query {:.4f}s".format(
+                    translation, legacy_time, current_time
+                )
+            )
+            for key, value in sorted(legacy.items()):
+                if (value or 0) != (current[key] or 0):
+                    self.stderr.write(
+                        "{}: {} differs ({} != {})".format(
+                            translation, key, value, current[key]
+                        )
+                    )
@@ -0,0 +1,43 @@
+# Generated by Django 3.0.7 on 2026-10-17 08:12
+
+from django.db import migrations
+
+
+def create_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute(
+            "CREATE INDEX unit_translation_context_index "
+            "ON trans_unit(translation_id, context, id)"
+        )
+    elif vendor == "mysql":
+        schema_editor.execute(
+            "CREATE INDEX unit_translation_context_index "
+            "ON trans_unit(translation_id, context(255), id)"
+        )
+    else:
+        raise Exception("Unsupported database: {}".format(vendor))
+
+
+def drop_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute("DROP INDEX unit_translation_context_index")
+    elif vendor == "mysql":
+        schema_editor.execute(
+            "ALTER TABLE trans_unit DROP INDEX unit_translation_context_index"
+        )
+    else:
+        raise Exception("Unsupported database: {}".format(vendor))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("trans", "0087_auto_20200615_0747"),
+    ]
+
+    # This can't be atomic on MySQL
+    operations = [
+        migrations.RunPython(create_index, drop_index, elidable=False, atomic=False)
+    ]
@@ -52,6 +52,18 @@ class WeblateConf(AppConf):
     # Minimal number of similar messages to show
     SIMILAR_MESSAGES = 5
 
+    # Commit pending changes of all translations from one author together
+    BATCH_COMMITS = False
+
+    # Number of processes used to parse translation files
+    PARSE_PROCESSES = 1
+
+    # Number of days to keep unused parsed files in the cache, 0 to disable
+    STORE_CACHE_DAYS = 14
+
+    # Update cached stats incrementally on unit changes
+    STATS_DELTA = True
+
     # Enable lazy commits
     COMMIT_PENDING_HOURS = 24
 
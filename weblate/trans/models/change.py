@@ -164,6 +164,17 @@ class ChangeManager(models.Manager):
             user = None
         return super().create(user=user, **kwargs)
 
+    def bulk_add(self, changes, batch_size=1000):
+        """Store several changes at once.
+
+        No notifications are sent, this is intended for actions which do not
+        trigger them.
+        """
+        changes = list(changes)
+        for change in changes:
+            change.fill_related()
+        return self.bulk_create(changes, batch_size=batch_size)
+
 
 class Change(models.Model, UserDisplayMixin):
     ACTION_UPDATE = 0
@@ -473,9 +484,8 @@ class Change(models.Model, UserDisplayMixin):
             "user": self.get_user_display(False),
         }
 
-    def save(self, *args, **kwargs):
-        from weblate.accounts.tasks import notify_change
-
+    def fill_related(self):
+        """Fill in denormalized relations."""
         if self.unit:
             self.translation = self.unit.translation
         if self.translation:
@@ -486,6 +496,11 @@ class Change(models.Model, UserDisplayMixin):
         if self.glossary_term:
             self.project = self.glossary_term.glossary.project
             self.language = self.glossary_term.language
+
+    def save(self, *args, **kwargs):
+        from weblate.accounts.tasks import notify_change
+
+        self.fill_related()
         super().save(*args, **kwargs)
         transaction.on_commit(lambda: notify_change.delay(self.pk))
 
@@ -22,7 +22,7 @@ import fnmatch
 import os
 import re
 import time
-from collections import Counter
+from collections import Counter, defaultdict
 from contextlib import contextmanager
 from copy import copy
 from glob import glob
@@ -49,6 +49,7 @@ from redis_lock import Lock
 
 from weblate.checks.flags import Flags
 from weblate.formats.models import FILE_FORMATS
+from weblate.formats.parallel import get_parse_executor, get_parsed_store, parse_store
 from weblate.lang.models import Language
 from weblate.memory.tasks import import_memory
 from weblate.trans.defines import (
@@ -71,6 +72,7 @@ from weblate.trans.signals import (
     vcs_post_commit,
     vcs_post_push,
     vcs_post_update,
+    vcs_pre_commit,
     vcs_pre_push,
     vcs_pre_update,
 )
@@ -91,6 +93,7 @@ from weblate.utils.celery import get_task_progress, is_task_ready
 from weblate.utils.db import FastDeleteMixin
 from weblate.utils.errors import report_error
 from weblate.utils.fields import JSONField
+from weblate.utils.hash import calculate_hash
 from weblate.utils.licenses import get_license_choices, get_license_url, is_libre
 from weblate.utils.render import (
     render_template,
@@ -843,6 +846,53 @@ class Component(FastDeleteMixin, models.Model, URLMixin, PathMixin):
         }
         self._sources_prefetched = True
 
+    def create_sources(self, units):
+        """Create missing source units for parsed translation at once."""
+        from weblate.trans.models.unit import Unit, UnitBulkSave
+
+        if self.template:
+            return
+        if not self._sources_prefetched:
+            self.preload_sources()
+
+        source_translation = self.source_translation
+        bulk = UnitBulkSave(source_translation)
+        seen = set()
+        pos = 0
+        for id_hash, unit in units:
+            if id_hash in seen:
+                continue
+            seen.add(id_hash)
+            pos += 1
+            if id_hash in self._sources:
+                continue
+            try:
+                source = unit.source
+                context = unit.context
+                source_unit = Unit(
+                    translation=source_translation,
+                    id_hash=id_hash,
+                    source=source,
+                    target=source,
+                    context=context,
+                    content_hash=calculate_hash(source, context),
+                    position=pos,
+                    note=unit.notes,
+                    location=unit.locations,
+                    flags=unit.flags,
+                    state=STATE_READONLY,
+                )
+            except Exception:
+                # Errors are reported when updating the translation unit
+                continue
+            bulk.add(source_unit, True, same_content=True, same_state=True)
+            bulk.add_change(source_unit, action=Change.ACTION_NEW_SOURCE)
+
+        bulk.save()
+        for source_unit in bulk.created:
+            self._sources[source_unit.id_hash] = source_unit
+            self.updated_sources[source_unit.id_hash] = source_unit
+
     def get_source(self, id_hash, create=None):
         """Cached access to source info."""
         from weblate.trans.models import Unit
@@ -1340,17 +1390,22 @@ class Component(FastDeleteMixin, models.Model, URLMixin, PathMixin):
         )
         components = {}
 
-        # Commit pending changes
         for translation in translations:
             if translation.component_id == self.id:
                 translation.component = self
             if translation.component.linked_component_id == self.id:
                 translation.component.linked_component = self
-            translation.commit_pending(
-                reason, user, skip_push=True, force=True, signals=False
-            )
             components[translation.component.pk] = translation.component
 
+        # Commit pending changes
+        if settings.BATCH_COMMITS:
+            self.commit_pending_batch(reason, user, translations)
+        else:
+            for translation in translations:
+                translation.commit_pending(
+                    reason, user, skip_push=True, force=True, signals=False
+                )
+
         # Fire postponed post commit signals
         for component in components.values():
             vcs_post_commit.send(sender=self.__class__, component=component)
@@ -1360,6 +1415,73 @@ class Component(FastDeleteMixin, models.Model, URLMixin, PathMixin):
 
         return True
 
+    def commit_pending_batch(self, reason, user, translations):
+        """Commit pending changes of translations grouped by author.
+
+        Every file is written once and all files with pending changes from
+        the same author are committed together.
+        """
+        groups = defaultdict(list)
+        with self.repository.lock, transaction.atomic():
+            for translation in translations:
+                pending = translation.get_pending_author()
+                if pending is None:
+                    continue
+                try:
+                    store = translation.store
+                except FileParseError as error:
+                    report_error(cause="Failed to parse file on commit")
+                    translation.log_error("skipping commit due to error: %s", error)
+                    continue
+                translation.log_info("committing pending changes (%s)", reason)
+                author, timestamp = pending
+                author_name = author.get_author_name()
+                translation.update_units(store, author_name, author.id)
+                groups[author_name].append((timestamp, translation))
+
+            for author_name, items in groups.items():
+                self.commit_translations(
+                    user,
+                    author_name,
+                    max(item[0] for item in items),
+                    [item[1] for item in items],
+                )
+
+        # Update stats (the translated flag might have changed)
+        for items in groups.values():
+            for _timestamp, translation in items:
+                translation.invalidate_cache()
+
+    def commit_translations(self, user, author, timestamp, translations):
+        """Commit files of several translations in single commit.
+
+        The post commit signal is not fired, this is up to the caller.
+        """
+        commit_messages = []
+        files = []
+        for translation in translations:
+            commit_messages.append(translation.get_commit_message(author))
+            vcs_pre_commit.send(
+                sender=translation.__class__, translation=translation, author=author
+            )
+            files.extend(translation.filenames)
+            files.extend(translation.addon_commit_files)
+            translation.addon_commit_files = []
+
+        if self.repository.needs_commit(*files):
+            self.log_info("committing %s as %s", files, author)
+            for translation in translations:
+                Change.objects.create(
+                    action=Change.ACTION_COMMIT, translation=translation, user=user
+                )
+            self.repository.commit(
+                "\n\n".join(commit_messages), author, timestamp, files
+            )
+
+        # Store updated hashes
+        for translation in translations:
+            translation.store_hash()
+
     def handle_parse_error(self, error, translation=None):
         """Handler for parse errors."""
         error_message = getattr(error, "strerror", "")
@@ -1563,6 +1685,61 @@ class Component(FastDeleteMixin, models.Model, URLMixin, PathMixin):
             )
             return False
 
+    def get_object_hashes(self, matches):
+        """Return VCS object hashes for all translation files in single batch.
+
+        Keys match filenames used by Translation.get_git_blob_hash.
+        """
+        filenames = [os.path.join(self.full_path, path) for path in matches]
+        if self.has_template():
+            filenames.append(self.template)
+            if self.intermediate:
+                filenames.append(self.intermediate)
+        try:
+            return self.repository.get_object_hashes(filenames)
+        except OSError:
+            # Missing files are handled when processing each translation
+            return {}
+
+    def parse_translations(self, matches, force=False, langs=None, hashes=None):
+        """Start parsing of changed translation files in worker processes.
+
+        Returns dictionary of futures for parsed files, the database is
+        updated from them in this process.
+        """
+        if self.intermediate:
+            return {}
+        executor = get_parse_executor(settings.PARSE_PROCESSES)
+        if executor is None:
+            return {}
+        translations = {
+            translation.filename: translation
+            for translation in self.translation_set.all()
+        }
+        template = self.get_template_filename() if self.has_template() else None
+        result = {}
+        for path in matches:
+            code = self.get_lang_code(path)
+            if langs is not None and code not in langs:
+                continue
+            translation = translations.get(path)
+            if translation is not None and not force and translation.revision:
+                translation.component = self
+                if translation.revision == translation.get_git_blob_hash(hashes):
+                    continue
+            result[path] = executor.submit(
+                parse_store,
+                self.file_format,
+                os.path.join(self.full_path, path),
+                template,
+                code,
+                path == self.template,
+            )
+        # Pending files are still parsed, this only releases the pool
+        # once it is done
+        executor.shutdown(wait=False)
+        return result
+
     def _create_translations(  # noqa: C901
         self,
         force: bool = False,
@@ -1610,6 +1787,8 @@ class Component(FastDeleteMixin, models.Model, URLMixin, PathMixin):
             self.translations_count = len(matches) + sum(
                 (c.translation_set.count() for c in self.linked_childs)
             )
+        hashes = self.get_object_hashes(matches)
+        parsed = self.parse_translations(matches, force, langs, hashes)
         for pos, path in enumerate(matches):
             if not self._sources_prefetched and path != self.template:
                 self.preload_sources()
@@ -1638,7 +1817,14 @@ class Component(FastDeleteMixin, models.Model, URLMixin, PathMixin):
                     )
                     continue
                 translation = Translation.objects.check_sync(
-                    self, lang, code, path, force, request=request
+                    self,
+                    lang,
+                    code,
+                    path,
+                    force,
+                    request=request,
+                    parsed=get_parsed_store(parsed.get(path)),
+                    hashes=hashes,
                 )
                 was_change |= bool(translation.reason)
                 translations[translation.id] = translation
@@ -1702,7 +1888,7 @@ class Component(FastDeleteMixin, models.Model, URLMixin, PathMixin):
             self.update_variants()
             component_post_update.send(sender=self.__class__, component=self)
             # Update translation memory
-            # transaction.on_commit(lambda: import_memory.delay(self.project_id, self.id))
+            transaction.on_commit(lambda: import_memory.delay(self.project_id, self.id))
 
         self.log_info("updating completed")
         return was_change
@@ -22,7 +22,7 @@ import codecs
 import os
 import tempfile
 
-from django.core.cache import cache
+from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.db import models, transaction
 from django.db.models import Max, Q
@@ -35,6 +35,11 @@ from weblate.checks.flags import Flags
 from weblate.checks.models import CHECKS
 from weblate.formats.auto import try_load
 from weblate.formats.base import UnitNotFound
+from weblate.formats.cache import (
+    get_store_cache_key,
+    load_cached_store,
+    save_cached_store,
+)
 from weblate.formats.helpers import BytesIOMode
 from weblate.lang.models import Language, Plural
 from weblate.trans.checklists import TranslationChecklist
@@ -48,6 +53,7 @@ from weblate.trans.models.unit import (
     STATE_FUZZY,
     STATE_TRANSLATED,
     Unit,
+    UnitBulkSave,
 )
 from weblate.trans.signals import store_post_load, vcs_post_commit, vcs_pre_commit
 from weblate.trans.util import split_plural
@@ -62,7 +68,17 @@ if TYPE_CHECKING:
     from weblate.trans.models import Component
 
 class TranslationManager(models.Manager):
-    def check_sync(self, component, lang, code, path, force=False, request=None):
+    def check_sync(
+        self,
+        component,
+        lang,
+        code,
+        path,
+        force=False,
+        request=None,
+        parsed=None,
+        hashes=None,
+    ):
         """Parse translation meta info and updates translation object."""
         translation = self.get_or_create(
             language=lang,
@@ -84,7 +100,7 @@ class TranslationManager(models.Manager):
             force = True
             translation.check_flags = flags
             translation.save(update_fields=["check_flags"])
-        translation.check_sync(force, request=request)
+        translation.check_sync(force, request=request, parsed=parsed, hashes=hashes)
 
         return translation
 
@@ -260,21 +276,49 @@ class Translation(models.Model, URLMixin, LoggerMixin):
             return None
         return os.path.join(self.component.full_path, self.filename)
 
+    def get_store_cache_key(self, force_intermediate=False):
+        """Return parsed store cache key based on content of the files."""
+        if (
+            not settings.STORE_CACHE_DAYS
+            or not self.component.file_format_cls.can_cache_store
+        ):
+            return None
+        try:
+            revision = self.get_git_blob_hash()
+        except OSError:
+            return None
+        return get_store_cache_key(
+            self.component.file_format,
+            self.get_filename(),
+            revision,
+            self.language_code,
+            self.is_template,
+            force_intermediate,
+        )
+
     def load_store(self, fileobj=None, force_intermediate=False):
         """Load translate-toolkit storage from disk."""
+        cache_key = None
         if fileobj is None:
             fileobj = self.get_filename()
+            cache_key = self.get_store_cache_key(force_intermediate)
         # Use intermediate store as template for source translation
         if force_intermediate or (self.is_template and self.component.intermediate):
             template = self.component.intermediate_store
         else:
             template = self.component.template_store
-        store = self.component.file_format_cls.parse(
-            fileobj,
-            template,
-            language_code=self.language_code,
-            is_template=self.is_template,
-        )
+        store = None
+        if cache_key:
+            store = load_cached_store(cache_key, template)
+        if store is None:
+            store = self.component.file_format_cls.parse(
+                fileobj,
+                template,
+                language_code=self.language_code,
+                is_template=self.is_template,
+            )
+            if cache_key:
+                save_cached_store(cache_key, store)
         store_post_load.send(sender=self.__class__, translation=self, store=store)
         return store
 
@@ -289,7 +333,7 @@ class Translation(models.Model, URLMixin, LoggerMixin):
             report_error(cause="Translation parse error")
             self.component.handle_parse_error(exc, self)
 
-    def sync_unit(self, dbunits, updated, id_hash, unit, pos):
+    def sync_unit(self, dbunits, updated, id_hash, unit, pos, bulk=None):
         try:
             newunit = dbunits[id_hash]
             is_new = False
@@ -297,7 +341,7 @@ class Translation(models.Model, URLMixin, LoggerMixin):
             newunit = Unit(translation=self, id_hash=id_hash, state=-1)
             is_new = True
 
-        newunit.update_from_unit(unit, pos, is_new)
+        newunit.update_from_unit(unit, pos, is_new, bulk=bulk)
 
         # Check if unit is worth notification:
         # - new and untranslated
@@ -314,8 +358,14 @@ class Translation(models.Model, URLMixin, LoggerMixin):
         # Store current unit ID
         updated[id_hash] = newunit
 
-    def check_sync(self, force=False, request=None, change=None):  # noqa: C901
-        """Check whether database is in sync with git and possibly updates."""
+    def check_sync(  # noqa: C901
+        self, force=False, request=None, change=None, parsed=None, hashes=None
+    ):
+        """Check whether database is in sync with git and possibly updates.
+
+        The parsed can contain already parsed file content to use and hashes
+        already calculated object hashes.
+        """
         if change is None:
             change = Change.ACTION_UPDATE
         if request is None:
@@ -324,9 +374,10 @@ class Translation(models.Model, URLMixin, LoggerMixin):
             user = request.user
 
         # Check if we're not already up to date
+        revision = self.get_git_blob_hash(hashes)
         if not self.revision:
             self.reason = "new file"
-        elif self.revision != self.get_git_blob_hash():
+        elif self.revision != revision:
             self.reason = "content changed"
         elif force:
             self.reason = "check forced"
@@ -343,7 +394,7 @@ class Translation(models.Model, URLMixin, LoggerMixin):
         pos = 0
 
         try:
-            store = self.store
+            store = self.store if parsed is None else parsed
             translation_store = None
 
             # Store plural
@@ -363,6 +414,7 @@ class Translation(models.Model, URLMixin, LoggerMixin):
                 translation_store = store
                 store = self.load_store(force_intermediate=True)
 
+            units = []
             for unit in store.content_units:
                 # Use translation store if exists and if it contains the string
                 if translation_store is not None:
@@ -377,35 +429,47 @@ class Translation(models.Model, URLMixin, LoggerMixin):
                             unit.source = translated_unit.source
                     except UnitNotFound:
                         pass
+                units.append((unit.id_hash, unit))
 
-                id_hash = unit.id_hash
+            # Source strings are handled individually as their changes
+            # propagate to all translations
+            bulk = None if self.is_source else UnitBulkSave(self)
+            if bulk is not None and not self.component.has_template():
+                self.component.create_sources(units)
 
+            duplicates = []
+            for id_hash, unit in units:
                 # Check for possible duplicate units
                 if id_hash in updated:
-                    newunit = updated[id_hash]
-                    self.log_warning(
-                        "duplicate string to translate: %s (%s)",
-                        newunit,
-                        repr(newunit.source),
-                    )
-                    Change.objects.create(
-                        unit=newunit,
-                        action=Change.ACTION_DUPLICATE_STRING,
-                        user=user,
-                        author=user,
-                    )
-                    self.component.trigger_alert(
-                        "DuplicateString",
-                        language_code=self.language.code,
-                        source=newunit.source,
-                        unit_pk=newunit.pk,
-                    )
+                    duplicates.append(updated[id_hash])
                     continue
 
                 # Update position
                 pos += 1
 
-                self.sync_unit(dbunits, updated, id_hash, unit, pos)
+                self.sync_unit(dbunits, updated, id_hash, unit, pos, bulk=bulk)
+
+            if bulk is not None:
+                bulk.save()
+
+            for newunit in duplicates:
+                self.log_warning(
+                    "duplicate string to translate: %s (%s)",
+                    newunit,
+                    repr(newunit.source),
+                )
+                Change.objects.create(
+                    unit=newunit,
+                    action=Change.ACTION_DUPLICATE_STRING,
+                    user=user,
+                    author=user,
+                )
+                self.component.trigger_alert(
+                    "DuplicateString",
+                    language_code=self.language.code,
+                    source=newunit.source,
+                    unit_pk=newunit.pk,
+                )
 
         except FileParseError as error:
             self.log_warning("skipping update due to parse error: %s", error)
@@ -420,14 +484,11 @@ class Translation(models.Model, URLMixin, LoggerMixin):
         # We should also do cleanup on source strings tracking objects
 
         # Update revision and stats
-        self.store_hash()
+        self.store_hash(revision)
 
         # Store change entry
         Change.objects.create(translation=self, action=change, user=user, author=user)
 
-        # Invalidate keys cache
-        transaction.on_commit(self.invalidate_keys)
-
     def do_update(self, request=None, method=None):
         return self.component.do_update(request, method=method)
 
@@ -443,26 +504,37 @@ class Translation(models.Model, URLMixin, LoggerMixin):
     def can_push(self):
         return self.component.can_push()
 
-    def get_git_blob_hash(self):
-        """Return current VCS blob hash for file."""
-        get_object_hash = self.component.repository.get_object_hash
-
+    def get_hash_filenames(self):
+        """Return list of files content of this translation depends on."""
         # Include language file
-        hashes = [get_object_hash(self.get_filename())]
+        filenames = [self.get_filename()]
 
         if self.component.has_template():
             # Include template
-            hashes.append(get_object_hash(self.component.template))
+            filenames.append(self.component.template)
 
             if self.component.intermediate:
                 # Include intermediate language as it might add new strings
-                hashes.append(get_object_hash(self.component.intermediate))
+                filenames.append(self.component.intermediate)
+
+        return filenames
 
-        return ",".join(hashes)
+    def get_git_blob_hash(self, hashes=None):
+        """Return current VCS blob hash for file.
 
-    def store_hash(self):
+        The hashes can contain already calculated object hashes.
+        """
+        filenames = self.get_hash_filenames()
+        if hashes is None or any(filename not in hashes for filename in filenames):
+            hashes = self.component.repository.get_object_hashes(filenames)
+
+        return ",".join(hashes[filename] for filename in filenames)
+
+    def store_hash(self, revision=None):
         """Store current hash in database."""
-        self.revision = self.get_git_blob_hash()
+        if revision is None:
+            revision = self.get_git_blob_hash()
+        self.revision = revision
         self.save(update_fields=["revision"])
 
     def get_last_author(self, email=False):
@@ -490,18 +562,11 @@ class Translation(models.Model, URLMixin, LoggerMixin):
         with self.component.repository.lock, transaction.atomic():
             while True:
                 # Find oldest change break loop if there is none left
-                try:
-                    unit = (
-                        self.unit_set.filter(pending=True)
-                        .annotate(Max("change__timestamp"))
-                        .order_by("change__timestamp__max")[0]
-                    )
-                except IndexError:
+                pending = self.get_pending_author()
+                if pending is None:
                     break
 
-                # Get last change metadata
-                author, timestamp = unit.get_last_content_change()
-
+                author, timestamp = pending
                 author_name = author.get_author_name()
 
                 # Flush pending units for this author
@@ -517,6 +582,23 @@ class Translation(models.Model, URLMixin, LoggerMixin):
 
         return True
 
+    def get_pending_author(self):
+        """Return author and timestamp of the oldest pending change.
+
+        Returns None if there is no pending change.
+        """
+        try:
+            unit = (
+                self.unit_set.filter(pending=True)
+                .annotate(Max("change__timestamp"))
+                .order_by("change__timestamp__max")[0]
+            )
+        except IndexError:
+            return None
+
+        # Get last change metadata
+        return unit.get_last_content_change()
+
     def get_commit_message(self, author, template=None, **kwargs):
         """Format commit message based on project configuration."""
         if template is None:
@@ -604,6 +686,8 @@ class Translation(models.Model, URLMixin, LoggerMixin):
     def update_units(self, store, author_name, author_id):
         """Update backend file and unit."""
         updated = False
+        added = False
+        changed = []
         for unit in self.unit_set.filter(pending=True).select_for_update():
             # Remove pending flag
             unit.pending = False
@@ -628,12 +712,14 @@ class Translation(models.Model, URLMixin, LoggerMixin):
                 continue
 
             updated = True
+            changed.append(pounit)
 
             # Optionally add unit to translation file.
             # This has be done prior setting tatget as some formats
             # generate content based on target language.
             if add:
                 store.add_unit(pounit.unit)
+                added = True
 
             # Store translations
             if unit.is_plural():
@@ -692,7 +778,10 @@ class Translation(models.Model, URLMixin, LoggerMixin):
         store.update_header(**headers)
 
         # save translation changes
-        store.save()
+        if added:
+            store.save()
+        else:
+            store.save_units(changed)
 
     @cached_property
     def enable_review(self):
@@ -1009,12 +1098,12 @@ class Translation(models.Model, URLMixin, LoggerMixin):
         # Invalidate summary stats
         transaction.on_commit(lambda: self.stats.invalidate(recurse))
 
-    @property
-    def keys_cache_key(self):
-        return "translation-keys-{}".format(self.pk)
-
-    def invalidate_keys(self):
-        cache.delete(self.keys_cache_key)
+    def update_stats(self, delta, change=None):
+        """Apply counter changes caused by unit edit to cached stats."""
+        if not settings.STATS_DELTA:
+            self.invalidate_cache()
+            return
+        transaction.on_commit(lambda: self.stats.update_unit(delta, change))
 
     def get_export_url(self):
         """Return URL of exported git repository."""
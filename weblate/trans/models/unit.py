@@ -19,6 +19,7 @@
 
 
 import re
+from collections import defaultdict
 from copy import copy
 
 from django.conf import settings
@@ -31,12 +32,13 @@ from django.utils.translation import gettext_lazy
 
 from weblate.checks.flags import Flags
 from weblate.checks.models import CHECKS, Check
+from weblate.checks.utils import get_check_cache_key
 from weblate.formats.helpers import CONTROLCHARS
 from weblate.memory.tasks import update_memory
 from weblate.trans.mixins import LoggerMixin
 from weblate.trans.models.change import Change
 from weblate.trans.models.comment import Comment
-from weblate.trans.signals import unit_pre_create
+from weblate.trans.signals import unit_post_bulk_save, unit_pre_create
 from weblate.trans.util import (
     get_distinct_translations,
     is_plural,
@@ -55,6 +57,7 @@ from weblate.utils.state import (
     STATE_READONLY,
     STATE_TRANSLATED,
 )
+from weblate.utils.stats import get_stats_delta, get_unit_stats
 
 SIMPLE_FILTERS = {
     "fuzzy": {"state": STATE_FUZZY},
@@ -72,6 +75,8 @@ SIMPLE_FILTERS = {
 
 NEWLINES = re.compile(r"\r\n|\r|\n")
 
+CHECKS_BATCH_SIZE = 1000
+
 
 class UnitQuerySet(models.QuerySet):
     def filter_type(self, rqtype):
@@ -298,7 +303,7 @@ class Unit(models.Model, LoggerMixin):
         )
 
         # Update checks if content or fuzzy flag has changed
-        if not same_content or not same_state:
+        if (not same_content or not same_state) and not self.defer_checks:
             self.run_checks()
 
     def get_absolute_url(self):
@@ -312,6 +317,8 @@ class Unit(models.Model, LoggerMixin):
         self.old_unit = copy(self)
         self.is_batch_update = False
         self.is_bulk_edit = False
+        # Checks are updated by the caller using run_checks_many
+        self.defer_checks = False
         self.source_updated = False
 
     @property
@@ -388,8 +395,11 @@ class Unit(models.Model, LoggerMixin):
             if any(char in text for char in CONTROLCHARS):
                 raise ValueError("String contains control char: {!r}".format(text))
 
-    def update_from_unit(self, unit, pos, created):
-        """Update Unit from ttkit unit."""
+    def update_from_unit(self, unit, pos, created, bulk=None):
+        """Update Unit from ttkit unit.
+
+        When bulk is given, the database update is deferred to it.
+        """
         component = self.translation.component
         self.is_batch_update = True
         # Get unit attributes
@@ -513,11 +523,19 @@ class Unit(models.Model, LoggerMixin):
             unit_pre_create.send(sender=self.__class__, unit=self)
 
         # Save into database
-        self.save(
-            force_insert=created,
-            same_content=same_source and same_target,
-            same_state=same_state,
-        )
+        if bulk is not None:
+            bulk.add(
+                self,
+                created,
+                same_content=same_source and same_target,
+                same_state=same_state,
+            )
+        else:
+            self.save(
+                force_insert=created,
+                same_content=same_source and same_target,
+                same_state=same_state,
+            )
         # Track updated sources for source checks
         if self.translation.is_template:
             component.updated_sources[self.id_hash] = self
@@ -526,12 +544,20 @@ class Unit(models.Model, LoggerMixin):
         #     self.labels.set(self.source_info.labels.all())
         # Indicate source string change
         if not same_source and previous_source:
-            Change.objects.create(
-                unit=self,
-                action=Change.ACTION_SOURCE_CHANGE,
-                old=previous_source,
-                target=self.source,
-            )
+            if bulk is not None:
+                bulk.add_change(
+                    self,
+                    action=Change.ACTION_SOURCE_CHANGE,
+                    old=previous_source,
+                    target=self.source,
+                )
+            else:
+                Change.objects.create(
+                    unit=self,
+                    action=Change.ACTION_SOURCE_CHANGE,
+                    old=previous_source,
+                    target=self.source,
+                )
 
     def update_state(self):
         """
@@ -653,11 +679,21 @@ class Unit(models.Model, LoggerMixin):
             self.state = STATE_TRANSLATED
         self.original_state = self.state
 
+        # Stats contribution before the change
+        has_suggestions = bool(self.suggestions)
+        old_stats = get_unit_stats(
+            self.old_unit.state,
+            self.old_unit.num_words,
+            len(self.old_unit.source),
+            bool(self.active_checks),
+            has_suggestions,
+        )
+
         # Save updated unit to database
         self.save()
 
         # Generate Change object for this change
-        self.generate_change(user or author, author, change_action)
+        change = self.generate_change(user or author, author, change_action)
 
         if change_action not in (
             Change.ACTION_UPLOAD,
@@ -665,7 +701,21 @@ class Unit(models.Model, LoggerMixin):
             Change.ACTION_BULK_EDIT,
         ):
             # Update translation stats
-            self.translation.invalidate_cache()
+            if self.translation.is_source:
+                self.translation.invalidate_cache()
+            else:
+                new_stats = get_unit_stats(
+                    self.state,
+                    self.num_words,
+                    len(self.source),
+                    bool(self.active_checks),
+                    has_suggestions,
+                )
+                if change.action not in Change.ACTIONS_CONTENT:
+                    change = None
+                self.translation.update_stats(
+                    get_stats_delta(old_stats, new_stats), change
+                )
 
             # Update user stats
             author.profile.translated += 1
@@ -749,7 +799,7 @@ class Unit(models.Model, LoggerMixin):
             action = Change.ACTION_NEW
 
         # Create change object
-        Change.objects.create(
+        return Change.objects.create(
             unit=self,
             action=action,
             user=user,
@@ -790,62 +840,34 @@ class Unit(models.Model, LoggerMixin):
 
     def run_checks(self):
         """Update checks for this unit."""
-        run_propagate = False
+        run_checks_many([self])
 
-        src = self.get_source_plurals()
-        tgt = self.get_target_plurals()
-
-        old_checks = self.all_checks_names
-        create = []
-
-        if self.translation.is_source:
-            Check.objects.filter(unit=self).delete() # skip source checks
-            return
-        
-            checks = CHECKS.source
-            meth = "check_source"
-            args = src, self
-        else:
-            checks = CHECKS.target
-            meth = "check_target"
-            args = src, tgt, self
-
-        # Run all checks
-        for check, check_obj in checks.items():
-            # Does the check fire?
-            if getattr(check_obj, meth)(*args):
-                if check in old_checks:
-                    # We already have this check
-                    old_checks.remove(check)
-                else:
-                    # Create new check
-                    create.append(Check(unit=self, dismissed=False, check=check))
-                    run_propagate |= check_obj.propagates
-
-        if create:
-            Check.objects.bulk_create(create, batch_size=500, ignore_conflicts=True)
-            # Propagate checks which need it (for example consistency)
-            if run_propagate:
-                for unit in self.same_source_units:
-                    try:
-                        unit.run_checks()
-                    except Unit.DoesNotExist:
-                        # This can happen in some corner cases like changing
-                        # source language of a project - the source language is
-                        # changed first and then components are updated. But
-                        # not all are yet updated and this spans across them.
-                        continue
-            # Trigger source checks on target check update (multiple failing checks)
-            if not self.translation.is_source:
-                self.source_info.is_batch_update = self.is_batch_update
-                self.source_info.run_checks()
-
-        # Delete no longer failing checks
-        if old_checks:
-            Check.objects.filter(unit=self, check__in=old_checks).delete()
-
-        # This is always preset as it is used in top of this method
-        del self.__dict__["all_checks"]
+    def enforce_checks(self):
+        """Revert state to needs editing if an enforced check is failing."""
+        if (
+            self.state >= STATE_TRANSLATED
+            and self.translation.component.enforced_checks
+            and self.all_checks_names & set(self.translation.component.enforced_checks)
+        ):
+            old_state = self.state
+            self.state = self.original_state = STATE_FUZZY
+            self.save(same_state=True, same_content=True, update_fields=["state"])
+            # Checks are not changed, so only the state contribution differs
+            if self.translation.is_source:
+                self.translation.invalidate_cache()
+            else:
+                args = (
+                    self.num_words,
+                    len(self.source),
+                    bool(self.active_checks),
+                    bool(self.suggestions),
+                )
+                self.translation.update_stats(
+                    get_stats_delta(
+                        get_unit_stats(old_state, *args),
+                        get_unit_stats(self.state, *args),
+                    )
+                )
 
     def nearby(self):
         """Return list of nearby messages based on location."""
@@ -860,27 +882,33 @@ class Unit(models.Model, LoggerMixin):
         )
 
     def nearby_keys(self):
+        """Return list of nearby messages based on key.
+
+        The neighbors are looked up as keyset ranges on (context, id), so only
+        a bounded number of rows is fetched regardless of translation size.
+        """
         # Do not show nearby keys on bilingual
         if not self.translation.component.has_template():
             return []
-        key = self.translation.keys_cache_key
-        key_list = cache.get(key)
-        if key_list is None or self.pk not in key_list or True:
-            key_list = list(
-                Unit.objects.filter(translation=self.translation)
-                .order_by("context")
-                .values_list("id", flat=True)
+        units = Unit.objects.filter(translation=self.translation)
+        before = (
+            units.filter(
+                Q(context__lt=self.context) | Q(context=self.context, pk__lt=self.pk)
             )
-            cache.set(key, key_list)
-        offset = key_list.index(self.pk)
-        nearby = key_list[
-            max(offset - settings.NEARBY_MESSAGES, 0) : offset
-            + settings.NEARBY_MESSAGES
-        ]
+            .order_by("-context", "-pk")
+            .values_list("pk", flat=True)[: settings.NEARBY_MESSAGES]
+        )
+        after = (
+            units.filter(
+                Q(context__gt=self.context) | Q(context=self.context, pk__gte=self.pk)
+            )
+            .order_by("context", "pk")
+            .values_list("pk", flat=True)[: settings.NEARBY_MESSAGES]
+        )
         return (
-            Unit.objects.filter(translation=self.translation, id__in=nearby)
+            Unit.objects.filter(pk__in=list(before) + list(after))
             .prefetch()
-            .order_by("context")
+            .order_by("context", "pk")
         )
 
     def variants(self):
@@ -918,21 +946,16 @@ class Unit(models.Model, LoggerMixin):
         )
 
         # Enforced checks can revert the state to needs editing (fuzzy)
+        if not self.defer_checks:
+            self.enforce_checks()
+
         if (
-            self.state >= STATE_TRANSLATED
-            and self.translation.component.enforced_checks
-            and self.all_checks_names & set(self.translation.component.enforced_checks)
+            propagate
+            and user
+            and self.target != self.old_unit.target
+            and self.state >= STATE_TRANSLATED
         ):
-            self.state = self.original_state = STATE_FUZZY
-            self.save(same_state=True, same_content=True, update_fields=["state"])
-
-        # if (
-        #     propagate
-        #     and user
-        #     and self.target != self.old_unit.target
-        #     and self.state >= STATE_TRANSLATED
-        # ):
-        #     update_memory(user, self)
+            update_memory(user, self)
 
         return saved
 
@@ -1029,3 +1052,236 @@ class Unit(models.Model, LoggerMixin):
                 filename = location_parts[0]
                 line = 0
             yield location, filename, line
+
+
+def run_checks_many(units, skip_missing=False):
+    """Update checks for many units at once.
+
+    All checks are evaluated first and the database is updated using few bulk
+    queries afterwards.
+    """
+    units = list(units)
+    if not units:
+        return
+
+    # Prefetch existing checks for all units
+    missing = [unit.pk for unit in units if "all_checks" not in unit.__dict__]
+    existing = defaultdict(list)
+    for start in range(0, len(missing), CHECKS_BATCH_SIZE):
+        batch = missing[start : start + CHECKS_BATCH_SIZE]
+        for check in Check.objects.filter(unit_id__in=batch):
+            existing[check.unit_id].append(check)
+
+    target_checks = [
+        (check, check_obj.check_target, check_obj.propagates, check_obj.pure)
+        for check, check_obj in CHECKS.target.items()
+        if not check_obj.batch
+    ]
+    # Checks evaluated for all units at once
+    batch_checks = [
+        check_obj for check_obj in CHECKS.target.values() if check_obj.batch
+    ]
+    batch_names = {check_obj.check_id for check_obj in batch_checks}
+
+    # Results of pure checks are cached by the unit content
+    cache_keys = {}
+    if settings.CHECK_CACHE_TIMEOUT:
+        cache_keys = {
+            unit.pk: get_check_cache_key(unit)
+            for unit in units
+            if not unit.translation.is_source
+        }
+    cached = cache.get_many(cache_keys.values()) if cache_keys else {}
+    update_cache = {}
+
+    source_pks = []
+    create = []
+    delete = defaultdict(list)
+    propagate = []
+    sources = {}
+
+    for unit in units:
+        if "all_checks" not in unit.__dict__:
+            unit.__dict__["all_checks"] = existing[unit.pk]
+        old_checks = unit.all_checks_names - batch_names
+        # This is always preset as it was used above
+        del unit.__dict__["all_checks"]
+
+        if unit.translation.is_source:
+            # Skip source checks
+            source_pks.append(unit.pk)
+            continue
+
+        src = unit.get_source_plurals()
+        tgt = unit.get_target_plurals()
+        unit_create = []
+        run_propagate = False
+        cache_key = cache_keys.get(unit.pk)
+        cached_pure = cached.get(cache_key)
+        fired_pure = []
+        try:
+            for check, check_target, propagates, pure in target_checks:
+                # Does the check fire?
+                if pure and cached_pure is not None:
+                    fired = check in cached_pure
+                else:
+                    fired = check_target(src, tgt, unit)
+                    if fired and pure:
+                        fired_pure.append(check)
+                if fired:
+                    if check in old_checks:
+                        # We already have this check
+                        old_checks.remove(check)
+                    else:
+                        # Create new check
+                        unit_create.append(
+                            Check(unit=unit, dismissed=False, check=check)
+                        )
+                        run_propagate |= propagates
+            source = unit.source_info if unit_create else None
+        except Unit.DoesNotExist:
+            if not skip_missing:
+                raise
+            # This can happen in some corner cases like changing
+            # source language of a project - the source language is
+            # changed first and then components are updated. But
+            # not all are yet updated and this spans across them.
+            continue
+
+        if cache_key and cached_pure is None:
+            update_cache[cache_key] = fired_pure
+
+        for check in old_checks:
+            delete[check].append(unit.pk)
+        if unit_create:
+            create.extend(unit_create)
+            # Propagate checks which need it (for example consistency)
+            if run_propagate:
+                propagate.append(unit)
+            # Trigger source checks on target check update (multiple failing checks)
+            source.is_batch_update = unit.is_batch_update
+            sources[source.pk] = source
+
+    if update_cache:
+        cache.set_many(update_cache, settings.CHECK_CACHE_TIMEOUT)
+
+    for start in range(0, len(source_pks), CHECKS_BATCH_SIZE):
+        batch = source_pks[start : start + CHECKS_BATCH_SIZE]
+        Check.objects.filter(unit_id__in=batch).delete()
+
+    if create:
+        Check.objects.bulk_create(
+            create, batch_size=CHECKS_BATCH_SIZE, ignore_conflicts=True
+        )
+
+    # Delete no longer failing checks
+    for check, pks in delete.items():
+        for start in range(0, len(pks), CHECKS_BATCH_SIZE):
+            batch = pks[start : start + CHECKS_BATCH_SIZE]
+            Check.objects.filter(unit_id__in=batch, check=check).delete()
+
+    if batch_checks:
+        translated = [unit for unit in units if not unit.translation.is_source]
+        for check_obj in batch_checks:
+            check_obj.update_many(translated)
+
+    if propagate:
+        processed = {unit.pk for unit in units}
+        same_source = {}
+        for unit in propagate:
+            for other in unit.same_source_units:
+                if other.pk not in processed:
+                    same_source[other.pk] = other
+        run_checks_many(same_source.values(), skip_missing=True)
+
+    if sources:
+        run_checks_many(sources.values())
+
+
+class UnitBulkSave:
+    """Collects units updated while parsing a file to store them in batches."""
+
+    update_fields = [
+        "position",
+        "location",
+        "flags",
+        "source",
+        "target",
+        "state",
+        "original_state",
+        "context",
+        "note",
+        "content_hash",
+        "previous_source",
+        "priority",
+        "num_words",
+        "extra_flags",
+    ]
+
+    def __init__(self, translation, batch_size=1000):
+        self.translation = translation
+        self.batch_size = batch_size
+        self.created = []
+        self.updated = []
+        self.check_units = []
+        self.changes = []
+
+    def add(self, unit, created, same_content=False, same_state=False):
+        # Store number of words, same as Unit.save does
+        if not same_content or not unit.num_words:
+            unit.num_words = len(unit.get_source_plurals()[0].split())
+        if created:
+            self.created.append(unit)
+        else:
+            self.updated.append(unit)
+        # Update checks if content or fuzzy flag has changed
+        if not same_content or not same_state:
+            self.check_units.append(unit)
+            if created:
+                # There are no checks for new units
+                unit.__dict__["all_checks"] = []
+
+    def add_change(self, unit, **kwargs):
+        self.changes.append((unit, kwargs))
+
+    def iterate_batches(self, items):
+        for start in range(0, len(items), self.batch_size):
+            yield items[start : start + self.batch_size]
+
+    def save_created(self):
+        Unit.objects.bulk_create(self.created, batch_size=self.batch_size)
+        if not self.created or self.created[0].pk is not None:
+            return
+        # Fetch ids on databases which do not return them from bulk insert
+        ids = {}
+        for batch in self.iterate_batches([unit.id_hash for unit in self.created]):
+            ids.update(
+                self.translation.unit_set.filter(id_hash__in=batch).values_list(
+                    "id_hash", "id"
+                )
+            )
+        for unit in self.created:
+            unit.pk = ids[unit.id_hash]
+            unit._state.adding = False
+            unit._state.db = Unit.objects.db
+
+    def save(self):
+        """Store collected units, update their checks and log changes."""
+        self.save_created()
+        Unit.objects.bulk_update(
+            self.updated, self.update_fields, batch_size=self.batch_size
+        )
+        run_checks_many(self.check_units)
+        Change.objects.bulk_add(
+            (Change(unit=unit, **kwargs) for unit, kwargs in self.changes),
+            batch_size=self.batch_size,
+        )
+
+        for units, created in ((self.created, True), (self.updated, False)):
+            if units:
+                unit_post_bulk_save.send(
+                    sender=Unit,
+                    translation=self.translation,
+                    units=units,
+                    created=created,
+                )
@@ -29,5 +29,6 @@ vcs_post_commit = Signal(providing_args=["component", "translation"])
 translation_post_add = Signal(providing_args=["translation"])
 component_post_update = Signal(providing_args=["component"])
 unit_pre_create = Signal(providing_args=["unit"])
+unit_post_bulk_save = Signal(providing_args=["translation", "units", "created"])
 user_pre_delete = Signal()
 store_post_load = Signal(providing_args=["store", "translation"])
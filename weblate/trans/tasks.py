@@ -36,12 +36,16 @@ from filelock import Timeout
 
 from weblate.addons.models import Addon
 from weblate.auth.models import User, get_anonymous
+from weblate.checks.consistency import update_consistency
+from weblate.formats.cache import cleanup_store_cache
+from weblate.lang.models import Language
 from weblate.trans.autotranslate import AutoTranslate
 from weblate.trans.exceptions import FileParseError
 from weblate.trans.models import (
     Change,
     Comment,
     Component,
+    ComponentList,
     Project,
     Suggestion,
     Translation,
@@ -51,6 +55,7 @@ from weblate.utils.celery import app
 from weblate.utils.data import data_dir
 from weblate.utils.errors import report_error
 from weblate.utils.files import remove_readonly
+from weblate.utils.stats import GlobalStats
 from weblate.vcs.base import RepositoryException
 
 SEARCH_LOGGER = logging.getLogger("weblate.search")
@@ -241,6 +246,13 @@ def cleanup_old_comments():
     Comment.objects.filter(timestamp__lt=cutoff).delete()
 
 
+@app.task(trail=False)
+def cleanup_parsed_stores():
+    if not settings.STORE_CACHE_DAYS:
+        return
+    cleanup_store_cache(settings.STORE_CACHE_DAYS)
+
+
 @app.task(trail=False)
 def repository_alerts(threshold=settings.REPOSITORY_ALERT_THRESHOLD):
     non_linked = Component.objects.with_repo()
@@ -391,6 +403,36 @@ def daily_update_checks():
         update_checks.delay(component_id)
 
 
+@app.task(trail=False)
+def reconcile_stats():
+    """Correct drift of incrementally updated stats."""
+    for project in Project.objects.iterator():
+        for component in project.component_set.iterator():
+            for translation in component.translation_set.iterator():
+                translation.stats.reconcile()
+            component.stats.reconcile()
+        for language in project.languages:
+            project.stats.get_single_language_stats(language).reconcile()
+        project.stats.reconcile()
+    for componentlist in ComponentList.objects.iterator():
+        componentlist.stats.reconcile()
+    for language in Language.objects.have_translation().iterator():
+        language.stats.reconcile()
+    GlobalStats().reconcile()
+
+
+@app.task(trail=False)
+def reconcile_consistency():
+    """Correct inconsistent checks not covered by updates of edited units.
+
+    This is needed after deleting units or changing translation propagation
+    of a component.
+    """
+    for project in Project.objects.iterator():
+        for language in project.languages:
+            update_consistency(project, language.id)
+
+
 @app.on_after_finalize.connect
 def setup_periodic_tasks(sender, **kwargs):
     sender.add_periodic_task(3600, commit_pending.s(), name="commit-pending")
@@ -400,6 +442,9 @@ def setup_periodic_tasks(sender, **kwargs):
     sender.add_periodic_task(
         crontab(hour=0, minute=30), daily_update_checks.s(), name="daily-update-checks"
     )
+    sender.add_periodic_task(
+        crontab(hour=1, minute=30), reconcile_stats.s(), name="reconcile-stats"
+    )
     sender.add_periodic_task(3600 * 24, repository_alerts.s(), name="repository-alerts")
     sender.add_periodic_task(3600 * 24, component_alerts.s(), name="component-alerts")
     sender.add_periodic_task(
@@ -414,3 +459,9 @@ def setup_periodic_tasks(sender, **kwargs):
     sender.add_periodic_task(
         3600 * 24, cleanup_old_comments.s(), name="cleanup-old-comments"
     )
+    sender.add_periodic_task(
+        3600 * 24, cleanup_parsed_stores.s(), name="cleanup-parsed-stores"
+    )
+    sender.add_periodic_task(
+        3600 * 24, reconcile_consistency.s(), name="reconcile-consistency"
+    )
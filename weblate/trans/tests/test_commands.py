@@ -394,6 +394,18 @@ class UnLockTranslationTest(WeblateComponentCommandTestCase):
     expected_string = ""
 
 
+class BenchmarkStatsTest(WeblateComponentCommandTestCase):
+    command_name = "benchmark_stats"
+    expected_string = "single query"
+
+
+class BenchmarkFindUnitTest(SimpleTestCase):
+    def test_benchmark(self):
+        output = StringIO()
+        call_command("benchmark_find_unit", units=100, lookups=10, stdout=output)
+        self.assertIn("aresource:", output.getvalue())
+
+
 class ImportDemoTestCase(TestCase):
     def test_import(self):
         try:
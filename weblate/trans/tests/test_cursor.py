@@ -0,0 +1,53 @@
+#
+# Copyright © 2012 - 2020 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+from django.test import SimpleTestCase
+
+from weblate.trans.cursor import CURSOR_LIMIT, SESSION_KEY, SearchCursor
+
+
+class SearchCursorTest(SimpleTestCase):
+    def test_create(self):
+        session = {"search_1_q=": {"ids": [1, 2]}}
+        cursor = SearchCursor.create(session, "1_q=", [3, 1, 2], url="q=")
+        self.assertEqual(list(session.keys()), [SESSION_KEY])
+        self.assertEqual(len(cursor), 3)
+        self.assertEqual(cursor[0], 3)
+        self.assertEqual(list(cursor[1:]), [1, 2])
+        self.assertEqual(cursor.index(2), 2)
+
+        loaded = SearchCursor.load(session, "1_q=")
+        self.assertEqual(list(loaded), [3, 1, 2])
+        self.assertEqual(loaded.data, {"url": "q="})
+
+        loaded.delete(session)
+        self.assertIsNone(SearchCursor.load(session, "1_q="))
+
+    def test_lru(self):
+        session = {}
+        for i in range(CURSOR_LIMIT):
+            SearchCursor.create(session, str(i), [i])
+        # Access first one to make it recently used
+        self.assertIsNotNone(SearchCursor.load(session, "0"))
+        SearchCursor.create(session, "new", [100])
+        self.assertEqual(len(session[SESSION_KEY]), CURSOR_LIMIT)
+        self.assertIsNotNone(SearchCursor.load(session, "0"))
+        self.assertIsNone(SearchCursor.load(session, "1"))
+        self.assertEqual(list(SearchCursor.load(session, "new")), [100])
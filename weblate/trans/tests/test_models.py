@@ -22,18 +22,27 @@
 
 import os
 import shutil
+from unittest.mock import patch
 
+from django.core.cache import cache
 from django.core.management.color import no_style
 from django.db import connection
 from django.test import LiveServerTestCase, TestCase
 from django.test.utils import override_settings
 
 from weblate.auth.models import Group, User
-from weblate.checks.models import Check
+from weblate.checks.models import CHECKS, Check
+from weblate.checks.utils import get_check_cache_key
+from weblate.formats.cache import (
+    cleanup_store_cache,
+    get_store_cache_path,
+    save_cached_store,
+)
 from weblate.lang.models import Language, Plural
 from weblate.trans.models import (
     Announcement,
     AutoComponentList,
+    Change,
     Comment,
     Component,
     ComponentList,
@@ -42,9 +51,12 @@ from weblate.trans.models import (
     Unit,
     Vote,
 )
+from weblate.trans.models.unit import run_checks_many
+from weblate.trans.tasks import reconcile_stats
 from weblate.trans.tests.utils import RepoTestMixin, create_test_user
 from weblate.utils.django_hacks import immediate_on_commit, immediate_on_commit_leave
-from weblate.utils.state import STATE_TRANSLATED
+from weblate.utils.state import STATE_FUZZY, STATE_TRANSLATED
+from weblate.utils.stats import GlobalStats
 
 
 def fixup_languages_seq():
@@ -204,6 +216,70 @@ class TranslationTest(RepoTestCase):
         self.assertEqual(translation.stats.fuzzy, 0)
         self.assertEqual(translation.stats.all_words, 15)
 
+    def test_sync_bulk(self):
+        component = self.create_component()
+        translation = component.translation_set.get(language_code="cs")
+        self.assertFalse(translation.unit_set.filter(num_words=0).exists())
+        # Source units are created in bulk with their changes
+        self.assertEqual(
+            Change.objects.filter(
+                action=Change.ACTION_NEW_SOURCE, component=component
+            ).count(),
+            component.source_translation.unit_set.count(),
+        )
+        # Reloading the file keeps the units
+        unit_ids = set(translation.unit_set.values_list("id", flat=True))
+        translation.check_sync(force=True)
+        self.assertEqual(
+            set(translation.unit_set.values_list("id", flat=True)), unit_ids
+        )
+
+    def test_store_cache(self):
+        component = self.create_component()
+        translation = component.translation_set.get(language_code="cs")
+        cache_key = translation.get_store_cache_key()
+        self.assertTrue(os.path.exists(get_store_cache_path(cache_key)))
+        # Loading unchanged file uses the cache
+        store = translation.load_store()
+        self.assertEqual(
+            [unit.id_hash for unit in store.content_units],
+            [unit.id_hash for unit in translation.store.content_units],
+        )
+        self.assertEqual(store.storefile, translation.get_filename())
+        # Changed content leads to different key
+        with open(translation.get_filename(), "a") as handle:
+            handle.write("\n")
+        self.assertNotEqual(cache_key, translation.get_store_cache_key())
+        # Unused entries are removed
+        cleanup_store_cache(-1)
+        self.assertFalse(os.path.exists(get_store_cache_path(cache_key)))
+
+    def test_store_cache_error(self):
+        component = self.create_component()
+        translation = component.translation_set.get(language_code="cs")
+        cache_key = translation.get_store_cache_key()
+        filename = get_store_cache_path(cache_key)
+        os.unlink(filename)
+        with patch("weblate.formats.cache.os.replace", side_effect=OSError), patch(
+            "weblate.formats.cache.report_error"
+        ) as report:
+            save_cached_store(cache_key, translation.store)
+        report.assert_called_once()
+        # Neither the entry nor the temporary file is left behind
+        self.assertEqual(
+            [
+                name
+                for name in os.listdir(os.path.dirname(filename))
+                if name.startswith(cache_key)
+            ],
+            [],
+        )
+
+    def test_store_cache_unsupported(self):
+        component = self.create_android()
+        translation = component.translation_set.get(language_code="cs")
+        self.assertIsNone(translation.get_store_cache_key())
+
     def test_validation(self):
         """Translation validation."""
         component = self.create_component()
@@ -221,6 +297,79 @@ class TranslationTest(RepoTestCase):
         self.assertEqual(translation.stats.all, 0)
         self.assertEqual(translation.stats.all_words, 0)
 
+    def test_delta_stats(self):
+        component = self.create_component()
+        translation = component.translation_set.get(language_code="cs")
+        project = component.project
+        stats = [
+            translation.stats,
+            component.stats,
+            project.stats,
+            project.stats.get_single_language_stats(translation.language),
+            translation.language.stats,
+            GlobalStats(),
+        ]
+        for item in stats:
+            item.ensure_basic()
+        unit = translation.unit_set.get(source="Hello, world!\n")
+        unit.translate(create_test_user(), "Nazdar svete!\n", STATE_TRANSLATED)
+        # Cached stats were updated without recalculation
+        self.assertEqual(translation.stats.load()["translated"], 1)
+        self.assertEqual(translation.stats.load()["translated_words"], 2)
+        for item in stats:
+            self.assertFalse(item.reconcile())
+
+        # Drifted stats are discarded
+        data = translation.stats.load()
+        data["translated"] = 3
+        cache.set(translation.stats.cache_key, data)
+        reconcile_stats()
+        self.assertEqual(translation.stats.load(), {})
+
+    def test_delta_stats_enforced(self):
+        component = self.create_component()
+        component.enforced_checks = ["same"]
+        component.save(update_fields=["enforced_checks"])
+        translation = component.translation_set.get(language_code="cs")
+        project = component.project
+        stats = [
+            translation.stats,
+            component.stats,
+            project.stats,
+            project.stats.get_single_language_stats(translation.language),
+            translation.language.stats,
+            GlobalStats(),
+        ]
+        for item in stats:
+            item.ensure_basic()
+        unit = translation.unit_set.get(source="Hello, world!\n")
+        # The failing enforced check reverts the state to needs editing
+        unit.translate(create_test_user(), "Hello, world!\n", STATE_TRANSLATED)
+        self.assertEqual(unit.state, STATE_FUZZY)
+        self.assertEqual(translation.stats.load()["translated"], 0)
+        self.assertEqual(translation.stats.load()["fuzzy"], 1)
+        self.assertEqual(translation.stats.load()["allchecks"], 1)
+        for item in stats:
+            self.assertFalse(item.reconcile())
+
+    @override_settings(BATCH_COMMITS=True)
+    def test_commit_batch(self):
+        component = self.create_component()
+        user = create_test_user()
+        start_rev = component.repository.last_revision
+        translations = component.translation_set.filter(language_code__in=("cs", "de"))
+        for translation in translations:
+            unit = translation.unit_set.get(source="Hello, world!\n")
+            unit.translate(user, "Nazdar svete!\n", STATE_TRANSLATED)
+        self.assertEqual(start_rev, component.repository.last_revision)
+        component.commit_pending("test", None)
+        # Both files are committed together
+        self.assertEqual(
+            len(component.repository.log_revisions("{}..HEAD".format(start_rev))), 1
+        )
+        for translation in translations:
+            self.assertFalse(translation.needs_commit())
+
     def test_commit_groupping(self):
         component = self.create_component()
         translation = component.translation_set.get(language_code="cs")
@@ -350,6 +499,10 @@ class UnitTest(ModelTestCase):
         unit.flags = "no-wrap, ignore-same"
         self.assertEqual(unit.all_flags.items(), {"no-wrap", "ignore-same"})
 
+    def test_nearby_keys(self):
+        unit = Unit.objects.filter(translation__language_code="cs")[0]
+        self.assertEqual(unit.nearby_keys(), [])
+
     def test_order_by_request(self):
         unit = Unit.objects.filter(translation__language_code="cs")[0]
         source = unit.source_info
@@ -407,6 +560,58 @@ class UnitTest(ModelTestCase):
         ).order_by_request({"sort_by": "position,timestamp"})
         self.assertEqual(multiple_ordered_unit.count(), 4)
 
+    def test_run_checks_many(self):
+        units = list(
+            Unit.objects.filter(translation__language_code="cs", source__endswith="\n")
+        )
+        self.assertTrue(units)
+        for unit in units:
+            unit.defer_checks = True
+            unit.target = unit.source.rstrip("\n")
+            unit.state = STATE_TRANSLATED
+            unit.save()
+        self.assertFalse(
+            Check.objects.filter(unit__in=units, check="end_newline").exists()
+        )
+        run_checks_many(units)
+        self.assertEqual(
+            Check.objects.filter(unit__in=units, check="end_newline").count(),
+            len(units),
+        )
+        for unit in units:
+            unit.target = unit.source
+            unit.save()
+        run_checks_many(units)
+        self.assertFalse(
+            Check.objects.filter(unit__in=units, check="end_newline").exists()
+        )
+
+    def test_run_checks_cache(self):
+        units = list(
+            Unit.objects.filter(translation__language_code="cs", source__endswith="\n")
+        )
+        for unit in units:
+            unit.defer_checks = True
+            unit.target = unit.source.rstrip("\n")
+            unit.state = STATE_TRANSLATED
+            unit.save()
+        run_checks_many(units)
+        self.assertIn("end_newline", cache.get(get_check_cache_key(units[0])))
+
+        Check.objects.filter(unit__in=units).delete()
+        check_obj = CHECKS["end_newline"]
+        with patch.object(check_obj, "check_target") as check_target:
+            # Cached results are used
+            run_checks_many(units)
+            check_target.assert_not_called()
+            with override_settings(CHECK_CACHE_TIMEOUT=0):
+                run_checks_many(units)
+                check_target.assert_called()
+        self.assertEqual(
+            Check.objects.filter(unit__in=units, check="end_newline").count(),
+            len(units),
+        )
+
     def test_get_max_length_no_pk(self):
         unit = Unit.objects.filter(translation__language_code="cs")[0]
         unit.pk = False
@@ -439,6 +644,24 @@ class UnitTest(ModelTestCase):
         self.assertEqual(unit.get_max_length(), 10000)
 
 
+class MonolingualUnitTest(RepoTestCase):
+    def setUp(self):
+        super().setUp()
+        self.component = self.create_po_mono()
+
+    @override_settings(NEARBY_MESSAGES=1)
+    def test_nearby_keys(self):
+        units = list(
+            Unit.objects.filter(translation__language_code="cs").order_by(
+                "context", "pk"
+            )
+        )
+        for offset, unit in enumerate(units):
+            self.assertEqual(
+                list(unit.nearby_keys()), units[max(offset - 1, 0) : offset + 1]
+            )
+
+
 class AnnouncementTest(ModelTestCase):
     """Test(s) for Announcement model."""
 
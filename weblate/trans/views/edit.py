@@ -18,8 +18,6 @@
 #
 
 
-import time
-
 from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.contrib.messages import get_messages
@@ -37,6 +35,7 @@ from weblate.checks.models import CHECKS, get_display_checks
 from weblate.glossary.forms import TermForm
 from weblate.glossary.models import Term
 from weblate.trans.autofixes import fix_target
+from weblate.trans.cursor import SearchCursor
 from weblate.trans.forms import (
     AntispamForm,
     AutoForm,
@@ -99,18 +98,6 @@ def get_other_units(unit):
     return result
 
 
-def cleanup_session(session):
-    """Delete old search results from session storage."""
-    now = int(time.time())
-    keys = list(session.keys())
-    for key in keys:
-        if not key.startswith("search_"):
-            continue
-        value = session[key]
-        if not isinstance(value, dict) or value["ttl"] < now or "items" not in value:
-            del session[key]
-
-
 def search(translation, request, form_class=SearchForm):
     """Perform search or returns cached search results."""
     # Possible new search
@@ -127,15 +114,14 @@ def search(translation, request, form_class=SearchForm):
         "checksum": form.cleaned_data.get("checksum"),
     }
     search_url = form.urlencode()
-    session_key = "search_{0}_{1}".format(translation.pk, search_url)
-
-    if (
-        session_key in request.session
-        and "offset" in request.GET
-        and "items" in request.session[session_key]
-    ):
-        search_result.update(request.session[session_key])
-        return search_result
+    search_key = "{0}_{1}".format(translation.pk, search_url)
+
+    if "offset" in request.GET:
+        cursor = SearchCursor.load(request.session, search_key)
+        if cursor is not None:
+            search_result.update(cursor.data)
+            search_result["ids"] = cursor
+            return search_result
 
     allunits = translation.unit_set.search(form.cleaned_data.get("q", "")).distinct()
 
@@ -152,21 +138,18 @@ def search(translation, request, form_class=SearchForm):
         messages.warning(request, _("No string matched your search!"))
         return redirect(translation)
 
-    # Remove old search results
-    cleanup_session(request.session)
-
-    store_result = {
-        "query": search_query,
-        "url": search_url,
-        "items": form.items(),
-        "key": session_key,
-        "name": force_str(name),
-        "ids": unit_ids,
-        "ttl": int(time.time()) + 86400,
-    }
-    request.session[session_key] = store_result
+    cursor = SearchCursor.create(
+        request.session,
+        search_key,
+        unit_ids,
+        query=search_query,
+        url=search_url,
+        items=form.items(),
+        name=force_str(name),
+    )
 
-    search_result.update(store_result)
+    search_result.update(cursor.data)
+    search_result["ids"] = cursor
     return search_result
 
 
@@ -423,7 +406,7 @@ def translate(request, project, component, lang):
     if not 0 < offset <= num_results:
         messages.info(request, _("The translation has come to an end."))
         # Delete search
-        del request.session[search_result["key"]]
+        search_result["ids"].delete(request.session)
         # Redirect to translation
         return redirect(translation)
 
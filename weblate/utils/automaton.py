@@ -0,0 +1,100 @@
+#
+# Copyright © 2012 - 2020 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+from collections import deque
+
+
+class Automaton:
+    """Aho-Corasick multi-pattern string matcher.
+
+    Patterns are added with an arbitrary payload and once the automaton is
+    built, all occurrences can be located in a single pass over the text,
+    independently of the number of patterns.
+    """
+
+    def __init__(self, patterns=()):
+        # Trie transitions, failure links and payloads indexed by node
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        self._built = False
+        for pattern, value in patterns:
+            self.add(pattern, value)
+
+    def __len__(self):
+        return len(self._goto)
+
+    def add(self, pattern, value=None):
+        """Add pattern with payload, returned on match."""
+        if not pattern:
+            return
+        if self._built:
+            raise ValueError("Can not add patterns to already built automaton")
+        node = 0
+        for char in pattern:
+            try:
+                node = self._goto[node][char]
+            except KeyError:
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[node][char] = node = len(self._goto) - 1
+        self._output[node].append((len(pattern), value))
+
+    def build(self):
+        """Compute failure links using breadth first traversal."""
+        if self._built:
+            return self
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in goto[node].items():
+                queue.append(child)
+                state = fail[node]
+                while state and char not in goto[state]:
+                    state = fail[state]
+                fail[child] = goto[state].get(char, 0)
+                if fail[child] == child:
+                    fail[child] = 0
+                output[child] = output[child] + output[fail[child]]
+        self._built = True
+        return self
+
+    def iter(self, text):
+        """Yield (start, end, value) for every pattern occurrence in text."""
+        if not self._built:
+            self.build()
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        node = 0
+        for pos, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for length, value in output[node]:
+                yield pos + 1 - length, pos + 1, value
+
+    def values(self, text):
+        """Return set of payloads of all patterns occurring in text."""
+        return {value for _start, _end, value in self.iter(text)}
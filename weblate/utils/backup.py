@@ -52,6 +52,8 @@ def tag_cache_dirs():
     dirs = [
         # Fontconfig cache
         data_dir("cache", "fonts"),
+        # Parsed translation files
+        data_dir("cache", "stores"),
         # Static files (default is inside data)
         settings.STATIC_ROOT,
     ]
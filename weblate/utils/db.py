@@ -19,16 +19,20 @@
 """Database specific code to extend Django."""
 
 from django.db import models, router
-from django.db.models import Case, IntegerField, Sum, When
+from django.db.models import Case, FloatField, Func, IntegerField, Sum, When
 from django.db.models.deletion import Collector
 from django.db.models.lookups import PatternLookup
 
 ESCAPED = frozenset(".\\+*?[^]$(){}=!<>|:-")
 
 
-def conditional_sum(value=1, **cond):
+def conditional_sum(value=1, condition=None, **cond):
     """Wrapper to generate SUM on boolean/enum values."""
-    return Sum(Case(When(then=value, **cond), default=0, output_field=IntegerField()))
+    return Sum(
+        Case(
+            When(condition, then=value, **cond), default=0, output_field=IntegerField()
+        )
+    )
 
 
 class PostgreSQLSearchLookup(PatternLookup):
@@ -72,6 +76,13 @@ class PostgreSQLSubstringLookup(PatternLookup):
         return "%s ILIKE %s" % (lhs, rhs), params
 
 
+class PostgreSQLSimilarity(Func):
+    """Trigram similarity from pg_trgm, can utilize pg_trgm index."""
+
+    function = "SIMILARITY"
+    output_field = FloatField()
+
+
 def table_has_row(connection, table, rowname):
     """Check whether actual table has row."""
     with connection.cursor() as cursor:
@@ -19,6 +19,7 @@
 
 
 import re
+from collections import Counter
 from functools import lru_cache, reduce
 
 import whoosh.qparser
@@ -58,6 +59,44 @@ class Comparer:
             # Too long string, mark them as not much similar
             return 50
 
+    def similarity_many(self, query, candidates, threshold=0):
+        """Returns similarities of query to all candidates.
+
+        Candidates below the threshold are reported as 0. Most of them are
+        detected without calculating the edit distance using length difference
+        and bag distance, both being lower bounds of the distance.
+        """
+        query_length = len(query)
+        query_chars = None
+        cache = {}
+        result = []
+        for candidate in candidates:
+            if candidate in cache:
+                result.append(cache[candidate])
+                continue
+            longer = max(query_length, len(candidate), 1)
+            # Distance allowed to reach the threshold multiplied by 100
+            allowed = longer * (100 - threshold)
+            if abs(query_length - len(candidate)) * 100 > allowed:
+                quality = 0
+            else:
+                if query_chars is None:
+                    query_chars = Counter(query)
+                chars = Counter(candidate)
+                bag_distance = max(
+                    sum((query_chars - chars).values()),
+                    sum((chars - query_chars).values()),
+                )
+                if bag_distance * 100 > allowed:
+                    quality = 0
+                else:
+                    quality = self.similarity(query, candidate)
+                    if quality < threshold:
+                        quality = 0
+            cache[candidate] = quality
+            result.append(quality)
+        return result
+
 
 class QuotePlugin(whoosh.qparser.SingleQuotePlugin):
     """Single and double quotes to specify a term."""
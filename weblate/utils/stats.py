@@ -17,24 +17,29 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 
-
+import os
+from contextlib import contextmanager
 from copy import copy
 from datetime import timedelta
-from itertools import chain
 from types import GeneratorType
 from uuid import uuid4
 
 import sentry_sdk
-from django.core.cache import cache
+from django.conf import settings
+from django.core.cache import cache, caches
 from django.core.exceptions import ObjectDoesNotExist
-from django.db.models import Count, Sum
+from django.db.models import Count, Exists, OuterRef, Q, Sum
 from django.db.models.functions import Length
 from django.utils import timezone
 from django.utils.functional import cached_property
+from django_redis.cache import RedisCache
+from filelock import FileLock, Timeout
+from redis_lock import Lock
 
-from weblate.checks.models import CHECKS
+from weblate.checks.models import CHECKS, Check
 from weblate.trans.filter import get_filter_choice
 from weblate.trans.util import translation_percent
+from weblate.utils.data import data_dir
 from weblate.utils.db import conditional_sum
 from weblate.utils.state import (
     STATE_APPROVED,
@@ -102,6 +107,71 @@ def zero_stats(keys):
     return stats
 
 
+def get_unit_stats(state, words, chars, has_checks=False, has_suggestions=False):
+    """Return counters a single unit contributes to the basic stats."""
+    items = ["translated" if state >= STATE_TRANSLATED else "todo"]
+    if state == STATE_EMPTY:
+        items.append("nottranslated")
+    elif state == STATE_FUZZY:
+        items.append("fuzzy")
+    if state >= STATE_APPROVED:
+        items.append("approved")
+        if has_suggestions:
+            items.append("approved_suggestions")
+    if has_checks:
+        items.append("allchecks")
+        if state == STATE_TRANSLATED:
+            items.append("translated_checks")
+    result = {}
+    for item in items:
+        result[item] = 1
+        result["{}_words".format(item)] = words
+        result["{}_chars".format(item)] = chars
+    return result
+
+
+def get_stats_delta(old, new):
+    """Calculate difference between two unit stats."""
+    result = {}
+    for key in set(old) | set(new):
+        value = new.get(key, 0) - old.get(key, 0)
+        if value:
+            result[key] = value
+    return result
+
+
+class StatsLockTimeout(Exception):
+    """Stats lock could not be acquired."""
+
+
+@contextmanager
+def stats_lock(name):
+    """Serialize stats delta updates of single cache entry."""
+    default_cache = caches["default"]
+    if isinstance(default_cache, RedisCache):
+        lock = Lock(
+            default_cache.client.get_client(),
+            name="stats-delta-lock-{}".format(name),
+            expire=60,
+            auto_renewal=True,
+        )
+        if not lock.acquire(timeout=5):
+            raise StatsLockTimeout()
+    else:
+        lock_dir = data_dir("cache", "stats-locks")
+        os.makedirs(lock_dir, exist_ok=True)
+        lock = FileLock(os.path.join(lock_dir, "{}.lock".format(name)), timeout=5)
+        try:
+            lock.acquire()
+        except Timeout:
+            raise StatsLockTimeout()
+
+    try:
+        yield
+    finally:
+        lock.release()
+
+
 def prefetch_stats(queryset):
     """Fetch stats from cache for a queryset."""
     # Force evaluating queryset/iterator, we need all objects
@@ -225,6 +295,58 @@ class BaseStats:
         """Clear local cache."""
         self._data = {}
 
+    def apply_delta(self, delta, change=None, language=None):
+        """Apply counter changes to cached stats.
+
+        Stats missing in the cache are left to be calculated on demand. Only
+        basic stats are updated, remaining cached items are dropped.
+        """
+        if "all" not in self.load():
+            self.clear()
+            return
+        try:
+            with stats_lock(self.cache_key):
+                self.update_cached(delta, change)
+        except StatsLockTimeout:
+            # Drop only this level, it is calculated again on demand
+            BaseStats.invalidate(self)
+
+    def update_cached(self, delta, change=None):
+        """Apply counter changes to cached stats, needs to be locked."""
+        data = self.load()
+        if "all" not in data:
+            self.clear()
+            return
+        self._data = {key: data[key] for key in self.basic_keys if key in data}
+        for key, value in delta.items():
+            self._data[key] = self._data.get(key, 0) + value
+        if change is not None:
+            last = self._data.get("last_changed")
+            if not last or last < change.timestamp:
+                self._data["last_changed"] = change.timestamp
+                self._data["last_author"] = change.author_id
+        self.calculate_basic_percents()
+        self.save()
+
+    def reconcile(self):
+        """Recalculate basic stats and drop the cache if they differ.
+
+        Returns whether cached stats were out of sync.
+        """
+        cached = self.load()
+        if "all" not in cached:
+            return False
+        self.clear()
+        self.prefetch_basic()
+        if any(
+            cached.get(key) != self._data.get(key)
+            for key in self.basic_keys
+            if not key.startswith("last_")
+        ):
+            self.invalidate()
+            return True
+        return False
+
     def store(self, key, value):
         if self._data is None:
             self._data = self.load()
@@ -337,6 +459,21 @@ class TranslationStats(BaseStats):
             self._object.component.stats.invalidate(language=self._object.language)
         self._object.language.stats.invalidate()
 
+    def apply_delta(self, delta, change=None, language=None):
+        super().apply_delta(delta, change)
+        if self._object.is_readonly:
+            return
+        self._object.component.stats.apply_delta(
+            delta, change, language=self._object.language
+        )
+        self._object.language.stats.apply_delta(delta, change)
+
+    def update_unit(self, delta, change=None):
+        """Apply unit change to stats across the hierarchy."""
+        if not delta and change is None:
+            return
+        self.apply_delta(delta, change)
+
     @property
     def language(self):
         return self._object.language
@@ -345,80 +482,49 @@ class TranslationStats(BaseStats):
     def has_review(self):
         return self._object.enable_review
 
-    def _prefetch_basic(self):
-        from weblate.trans.models import Unit
-
-        base = self._object.unit_set
-        stats = base.aggregate(
-            all=Count("id"),
-            all_words=Sum("num_words"),
-            all_chars=Sum(Length("source")),
-            fuzzy=conditional_sum(1, state=STATE_FUZZY),
-            fuzzy_words=conditional_sum("num_words", state=STATE_FUZZY),
-            fuzzy_chars=conditional_sum(Length("source"), state=STATE_FUZZY),
-            translated=conditional_sum(1, state__gte=STATE_TRANSLATED),
-            translated_words=conditional_sum("num_words", state__gte=STATE_TRANSLATED),
-            translated_chars=conditional_sum(
-                Length("source"), state__gte=STATE_TRANSLATED
-            ),
-            todo=conditional_sum(1, state__lt=STATE_TRANSLATED),
-            todo_words=conditional_sum("num_words", state__lt=STATE_TRANSLATED),
-            todo_chars=conditional_sum(Length("source"), state__lt=STATE_TRANSLATED),
-            nottranslated=conditional_sum(1, state=STATE_EMPTY),
-            nottranslated_words=conditional_sum("num_words", state=STATE_EMPTY),
-            nottranslated_chars=conditional_sum(Length("source"), state=STATE_EMPTY),
-            approved=conditional_sum(1, state__gte=STATE_APPROVED),
-            approved_words=conditional_sum("num_words", state__gte=STATE_APPROVED),
-            approved_chars=conditional_sum(Length("source"), state__gte=STATE_APPROVED),
-            unlabeled=conditional_sum(1, labels__isnull=True),
-            unlabeled_words=conditional_sum("num_words", labels__isnull=True),
-            unlabeled_chars=conditional_sum(Length("source"), labels__isnull=True),
-        )
-        check_stats = Unit.objects.filter(
-            id__in=set(base.filter(check__dismissed=False).values_list("id", flat=True))
-        ).aggregate(
-            allchecks=Count("id"),
-            allchecks_words=Sum("num_words"),
-            allchecks_chars=Sum(Length("source")),
-            translated_checks=conditional_sum(1, state=STATE_TRANSLATED),
-            translated_checks_words=conditional_sum(
-                "num_words", state=STATE_TRANSLATED
-            ),
-            translated_checks_chars=conditional_sum(
-                Length("source"), state=STATE_TRANSLATED
-            ),
-        )
-        suggestion_stats = Unit.objects.filter(
-            id__in=set(
-                base.filter(suggestion__isnull=False).values_list("id", flat=True)
-            )
-        ).aggregate(
-            suggestions=Count("id"),
-            suggestions_words=Sum("num_words"),
-            suggestions_chars=Sum(Length("source")),
-            approved_suggestions=conditional_sum(1, state__gte=STATE_APPROVED),
-            approved_suggestions_words=conditional_sum(
-                "num_words", state__gte=STATE_APPROVED
+    def get_basic_stats(self):
+        """Calculate basic stats using single query."""
+        from weblate.trans.models import Comment, Suggestion, Unit
+
+        units = self._object.unit_set.annotate(
+            chars=Length("source"),
+            has_checks=Exists(
+                Check.objects.filter(unit=OuterRef("pk"), dismissed=False)
             ),
-            approved_suggestions_chars=conditional_sum(
-                Length("source"), state__gte=STATE_APPROVED
+            has_suggestions=Exists(Suggestion.objects.filter(unit=OuterRef("pk"))),
+            has_comments=Exists(
+                Comment.objects.filter(unit=OuterRef("pk"), resolved=False)
             ),
+            has_labels=Exists(Unit.labels.through.objects.filter(unit=OuterRef("pk"))),
         )
-        comment_stats = Unit.objects.filter(
-            id__in=set(
-                base.filter(comment__resolved=False).values_list("id", flat=True)
+        conditions = {
+            "fuzzy": Q(state=STATE_FUZZY),
+            "translated": Q(state__gte=STATE_TRANSLATED),
+            "todo": Q(state__lt=STATE_TRANSLATED),
+            "nottranslated": Q(state=STATE_EMPTY),
+            "approved": Q(state__gte=STATE_APPROVED),
+            "allchecks": Q(has_checks=True),
+            "translated_checks": Q(has_checks=True, state=STATE_TRANSLATED),
+            "suggestions": Q(has_suggestions=True),
+            "approved_suggestions": Q(has_suggestions=True, state__gte=STATE_APPROVED),
+            "comments": Q(has_comments=True),
+            "unlabeled": Q(has_labels=False),
+        }
+        aggregates = {
+            "all": Count("id"),
+            "all_words": Sum("num_words"),
+            "all_chars": Sum("chars"),
+        }
+        for item, condition in conditions.items():
+            aggregates[item] = conditional_sum(1, condition)
+            aggregates["{}_words".format(item)] = conditional_sum(
+                "num_words", condition
             )
-        ).aggregate(
-            comments=Count("id"),
-            comments_words=Sum("num_words"),
-            comments_chars=Sum(Length("source")),
-        )
-        for key, value in chain(
-            stats.items(),
-            check_stats.items(),
-            suggestion_stats.items(),
-            comment_stats.items(),
-        ):
+            aggregates["{}_chars".format(item)] = conditional_sum("chars", condition)
+        return units.aggregate(**aggregates)
+
+    def _prefetch_basic(self):
+        for key, value in self.get_basic_stats().items():
             self.store(key, value)
 
         # Calculate some values
@@ -634,6 +740,12 @@ class ComponentStats(LanguageStats):
         for clist in self._object.componentlist_set.iterator():
             clist.stats.invalidate()
 
+    def apply_delta(self, delta, change=None, language=None):
+        super().apply_delta(delta, change)
+        self._object.project.stats.apply_delta(delta, change, language=language)
+        for clist in self._object.componentlist_set.iterator():
+            clist.stats.apply_delta(delta, change)
+
     def get_language_stats(self):
         yield from (
             TranslationStats(translation) for translation in self.translation_set 
@@ -713,6 +825,12 @@ class ProjectStats(BaseStats):
                 self.get_single_language_stats(lang).invalidate()
         GlobalStats().invalidate()
 
+    def apply_delta(self, delta, change=None, language=None):
+        super().apply_delta(delta, change)
+        if language:
+            self.get_single_language_stats(language).apply_delta(delta, change)
+        GlobalStats().apply_delta(delta, change)
+
     @cached_property
     def component_set(self):
         return prefetch_stats(self._object.component_set.prefetch_source_stats())
@@ -0,0 +1,48 @@
+#
+# Copyright © 2012 - 2020 Michal Čihař <michal@cihar.com>
+#
+# This file is part of Weblate <https://weblate.org/>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+
+from django.test import SimpleTestCase
+
+from weblate.utils.automaton import Automaton
+
+
+class AutomatonTest(SimpleTestCase):
+    def test_iter(self):
+        automaton = Automaton(
+            [("he", "he"), ("she", "she"), ("his", "his"), ("hers", "hers")]
+        )
+        self.assertEqual(
+            sorted(automaton.iter("ushers")),
+            [(1, 4, "she"), (2, 4, "he"), (2, 6, "hers")],
+        )
+
+    def test_values(self):
+        automaton = Automaton([("thank", 1), ("thank you", 2), ("hello", 3)])
+        self.assertEqual(automaton.values("thank you for using"), {1, 2})
+        self.assertEqual(automaton.values("nothing"), set())
+
+    def test_duplicate(self):
+        automaton = Automaton([("a", 1), ("a", 2), ("", 3)])
+        self.assertEqual(automaton.values("bab"), {1, 2})
+
+    def test_built(self):
+        automaton = Automaton([("a", 1)]).build()
+        with self.assertRaises(ValueError):
+            automaton.add("b", 2)
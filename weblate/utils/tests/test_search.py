@@ -52,6 +52,22 @@ class ComparerTest(SimpleTestCase):
         # This is expected to raise MemoryError inside jellyfish
         self.assertLessEqual(Comparer().similarity("a" * 200000, "b" * 200000), 50)
 
+    def test_many(self):
+        comparer = Comparer()
+        candidates = ["Hello", "Hello!", "Hi", "Hello world, how are you?", "Hello"]
+        self.assertEqual(
+            comparer.similarity_many("Hello", candidates),
+            [comparer.similarity("Hello", candidate) for candidate in candidates],
+        )
+
+    def test_many_threshold(self):
+        self.assertEqual(
+            Comparer().similarity_many(
+                "Hello", ["Hello!", "Hi", "olleH", "Hello world"], 75
+            ),
+            [83, 0, 0, 0],
+        )
+
 
 class QueryParserTest(TestCase):
     def assert_query(self, string, expected):
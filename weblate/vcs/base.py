@@ -24,6 +24,7 @@ import os
 import os.path
 import subprocess
 from distutils.version import LooseVersion
+from time import time
 from typing import Optional
 
 from dateutil import parser
@@ -39,6 +40,12 @@ from weblate.vcs.ssh import SSH_WRAPPER
 
 LOGGER = logging.getLogger("weblate.vcs")
 
+# Cache of file hashes, validated using file stat information
+FILE_HASH_CACHE = {}
+FILE_HASH_CACHE_SIZE = 10000
+# Size of chunks used when hashing files
+HASH_CHUNK_SIZE = 1024 * 1024
+
 
 class RepositoryException(Exception):
     """Error while working with a repository."""
@@ -363,12 +370,85 @@ class Repository:
 
     @staticmethod
     def update_hash(objhash, filename, extra=None):
+        """Update hash with Git blob of the file.
+
+        The file is read in chunks to avoid loading large files into memory.
+        """
         with open(filename, "rb") as handle:
-            data = handle.read()
-        if extra:
-            objhash.update(extra.encode())
-        objhash.update("blob {0}\0".format(len(data)).encode("ascii"))
-        objhash.update(data)
+            size = os.fstat(handle.fileno()).st_size
+            if extra:
+                objhash.update(extra.encode())
+            objhash.update("blob {0}\0".format(size).encode("ascii"))
+            while True:
+                data = handle.read(HASH_CHUNK_SIZE)
+                if not data:
+                    break
+                objhash.update(data)
+
+    def get_file_hash(self, filename):
+        """Return Git compatible hash of the file.
+
+        The hashes are cached as long as the file stat information is not
+        changed.
+        """
+        stat = os.stat(filename)
+        key = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        cached = FILE_HASH_CACHE.get(filename)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        objhash = hashlib.sha1()
+        self.update_hash(objhash, filename)
+        result = objhash.hexdigest()
+        # Do not cache files modified just now, the timestamp resolution
+        # might not be enough to detect further changes
+        if time() - stat.st_mtime > 2:
+            if len(FILE_HASH_CACHE) >= FILE_HASH_CACHE_SIZE:
+                FILE_HASH_CACHE.clear()
+            FILE_HASH_CACHE[filename] = (key, result)
+        return result
+
+    def get_file_hashes(self, names):
+        """Return Git compatible hashes for files within the repository."""
+        return {
+            name: self.get_file_hash(os.path.join(self.path, name)) for name in names
+        }
+
+    def get_object_hashes(self, paths):
+        """Return hashes of objects in the VCS for given paths.
+
+        All files are hashed in single batch, see get_object_hash for details.
+        """
+        resolved = {}
+        names = set()
+        for path in paths:
+            name = self.resolve_symlinks(path)
+            real_path = os.path.join(self.path, name)
+            if os.path.isdir(real_path):
+                files = []
+                for root, _unused, filenames in os.walk(real_path):
+                    for filename in filenames:
+                        full_name = os.path.join(root, filename)
+                        files.append(os.path.relpath(full_name, self.path))
+                files.sort()
+                names.update(files)
+            else:
+                files = None
+                names.add(name)
+            resolved[path] = (name, files)
+
+        hashes = self.get_file_hashes(names)
+
+        result = {}
+        for path, (name, files) in resolved.items():
+            if files is None:
+                result[path] = hashes[name]
+            else:
+                objhash = hashlib.sha1()
+                for filename in files:
+                    objhash.update(filename.encode())
+                    objhash.update(hashes[filename].encode())
+                result[path] = objhash.hexdigest()
+        return result
 
     def get_object_hash(self, path):
         """Return hash of object in the VCS.
@@ -377,21 +457,7 @@ class Repository:
         dirs it behaves differently as we do not need to track some attributes (for
         example permissions).
         """
-        real_path = os.path.join(self.path, self.resolve_symlinks(path))
-        objhash = hashlib.sha1()
-
-        if os.path.isdir(real_path):
-            files = []
-            for root, _unused, filenames in os.walk(real_path):
-                for filename in filenames:
-                    full_name = os.path.join(root, filename)
-                    files.append((full_name, os.path.relpath(full_name, self.path)))
-            for filename, name in sorted(files):
-                self.update_hash(objhash, filename, name)
-        else:
-            self.update_hash(objhash, real_path)
-
-        return objhash.hexdigest()
+        return self.get_object_hashes([path])[path]
 
     def configure_remote(self, pull_url, push_url, branch):
         """Configure remote repository."""
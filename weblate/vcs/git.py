@@ -32,6 +32,9 @@ from weblate.utils.xml import parse_xml
 from weblate.vcs.base import Repository, RepositoryException
 from weblate.vcs.gpg import get_gpg_sign_key
 
+# Number of paths passed to single git ls-files invocation
+INDEX_BATCH_SIZE = 1000
+
 
 class GitRepository(Repository):
     """Repository implementation for Git."""
@@ -334,6 +337,56 @@ class GitRepository(Repository):
             merge_err=False,
         )
 
+    def list_index_hashes(self, names):
+        """Return blob hashes from the index for files not modified in work tree."""
+        result = {}
+        # The paths are passed on the command line, process them in chunks
+        for start in range(0, len(names), INDEX_BATCH_SIZE):
+            chunk = names[start : start + INDEX_BATCH_SIZE]
+            output = self.execute(
+                ["--literal-pathspecs", "ls-files", "--stage", "-z", "--"] + chunk,
+                needs_lock=False,
+                merge_err=False,
+            )
+            hashes = {}
+            for line in output.split("\0"):
+                if not line:
+                    continue
+                info, name = line.split("\t", 1)
+                mode, objhash, stage = info.split()
+                # Skip unmerged entries, symlinks and submodules
+                if stage == "0" and mode.startswith("100"):
+                    hashes[name] = objhash
+            if not hashes:
+                continue
+            # Git compares stat information with the index and checks
+            # content only for files where it does not match
+            output = self.execute(
+                ["--literal-pathspecs", "ls-files", "--modified", "-z", "--"]
+                + list(hashes),
+                needs_lock=False,
+                merge_err=False,
+            )
+            for name in output.split("\0"):
+                hashes.pop(name, None)
+            result.update(hashes)
+        return result
+
+    def get_file_hashes(self, names):
+        """Return Git compatible hashes for files within the repository.
+
+        Files not modified in the working tree use blob hashes from the index,
+        remaining files are hashed directly.
+        """
+        try:
+            result = self.list_index_hashes(sorted(names))
+        except RepositoryException:
+            result = {}
+        missing = [name for name in names if name not in result]
+        if missing:
+            result.update(super().get_file_hashes(missing))
+        return result
+
     def cleanup(self):
         """Remove not tracked files from the repository."""
         self.execute(["clean", "-f"])
@@ -22,6 +22,7 @@ import os.path
 import shutil
 import tempfile
 from unittest import SkipTest
+from unittest.mock import patch
 
 from django.test import TestCase
 from django.test.utils import override_settings
@@ -30,7 +31,7 @@ from django.utils import timezone
 from weblate.trans.models import Component, Project
 from weblate.trans.tests.utils import RepoTestMixin, TempDirMixin, get_test_file
 from weblate.utils.files import remove_readonly
-from weblate.vcs.base import RepositoryException
+from weblate.vcs.base import Repository, RepositoryException
 from weblate.vcs.git import (
     GitForcePushRepository,
     GithubRepository,
@@ -376,6 +377,32 @@ class VCSGitTest(TestCase, RepoTestMixin, TempDirMixin):
         obj_hash = self.repo.get_object_hash("README.md")
         self.assertEqual(len(obj_hash), 40)
 
+    def test_object_hashes(self):
+        hashes = self.repo.get_object_hashes(["README.md", "po"])
+        self.assertEqual(hashes["README.md"], self.repo.get_object_hash("README.md"))
+        self.assertEqual(hashes["po"], self.repo.get_object_hash("po"))
+        # Hash from the index matches the file content
+        self.assertEqual(
+            hashes["README.md"],
+            Repository.get_file_hashes(self.repo, ["README.md"])["README.md"],
+        )
+        # Modified file is hashed from the working tree
+        with open(os.path.join(self.tempdir, "README.md"), "w") as handle:
+            handle.write("test\n")
+        self.assertEqual(
+            self.repo.get_object_hash("README.md"),
+            "9daeafb9864cf43055ae93beb0afd6c7d144bfa4",
+        )
+
+    @patch("weblate.vcs.base.HASH_CHUNK_SIZE", 2)
+    def test_object_hash_chunked(self):
+        with open(os.path.join(self.tempdir, "README.md"), "w") as handle:
+            handle.write("test\n")
+        self.assertEqual(
+            self.repo.get_object_hash("README.md"),
+            "9daeafb9864cf43055ae93beb0afd6c7d144bfa4",
+        )
+
     def test_configure_remote(self):
         with self.repo.lock:
             self.repo.configure_remote("pullurl", "pushurl", "branch")
@@ -411,6 +438,12 @@ class VCSGitTest(TestCase, RepoTestMixin, TempDirMixin):
     def test_get_file(self):
         self.assertIn("msgid", self.repo.get_file("po/cs.po", self.repo.last_revision))
 
+    def test_get_file_missing(self):
+        revision = self.repo.last_revision
+        with self.assertRaises(RepositoryException):
+            self.repo.get_file("missing file.po", revision)
+        self.assertIn("msgid", self.repo.get_file("po/cs.po", revision))
+
     def test_remote_branches(self):
         self.assertEqual(self._remote_branches, self.repo.list_remote_branches())
 
@@ -570,6 +603,9 @@ class VCSLocalTest(VCSGitTest):
     def test_get_file(self):
         raise SkipTest("Not supported")
 
+    def test_get_file_missing(self):
+        raise SkipTest("Not supported")
+
     def test_remove(self):
         raise SkipTest("Not supported")
 